@@ -0,0 +1,273 @@
+import numpy as np
+from typing import Optional, Union
+from pathlib import Path
+from DeckManager import DeckManager
+from models.CardEffect import OP_DAMAGE, OP_CASTLE, OP_FENCE, OP_STACKS, OP_ALL, OP_TRANSFER, OP_RESOURCE, TARGET_ENEMY
+
+HAND_SIZE = 8
+EMPTY_SLOT = -1
+NO_OP = -1
+
+def build_card_tables() -> dict[str, np.ndarray]:
+    """Builds per card index lookup tables (costs, paid resource and compiled actions) from cards.json."""
+    all_cards = DeckManager.load_all_cards()
+    max_actions = max(len(card.actions) for card in all_cards)
+
+    opcodes = np.full((len(all_cards), max_actions), NO_OP, dtype=np.int64)
+    targets = np.zeros((len(all_cards), max_actions), dtype=np.int64)
+    values = np.zeros((len(all_cards), max_actions), dtype=np.int64)
+    for card_index, card in enumerate(all_cards):
+        for action_index, (opcode, target, value) in enumerate(card.actions):
+            opcodes[card_index, action_index] = opcode
+            targets[card_index, action_index] = target
+            values[card_index, action_index] = value
+
+    return {
+        'cost': np.array([card.cost for card in all_cards], dtype=np.int64),
+        'resource': np.array([int(card.material_type) for card in all_cards], dtype=np.int64),
+        'opcode': opcodes,
+        'target': targets,
+        'value': values,
+    }
+
+CARD_TABLES = build_card_tables()
+
+class BatchGame:
+    """
+    Runs many independent games in lock-step on NumPy arrays.
+
+    Follows the rules of Game.apply_move: castle/fence (N, 2), resources (N, 2, 3, 2) as
+    [income, stock] per resource type, hands (N, 2, 8) of card indices with -1 for empty
+    slots and deck stacks (N, 2, D) drawn from the end. Player index 0 is player1.
+    """
+    def __init__(
+        self, num_games: int,
+        player1_deck: Union[str, Path] = 'default_deck.json', player2_deck: Union[str, Path] = 'default_deck.json',
+        seed: Optional[int] = None, record: bool = False
+    ) -> None:
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.deck_templates = [
+            np.array(DeckManager.load_deck_indices(player1_deck), dtype=np.int64),
+            np.array(DeckManager.load_deck_indices(player2_deck), dtype=np.int64),
+        ]
+        deck_capacity = max(len(template) for template in self.deck_templates)
+
+        self.castle = np.full((num_games, 2), 30, dtype=np.int64)
+        self.fence = np.full((num_games, 2), 10, dtype=np.int64)
+        self.resources = np.tile(np.array([2, 5], dtype=np.int64), (num_games, 2, 3, 1))
+        self.hands = np.full((num_games, 2, HAND_SIZE), EMPTY_SLOT, dtype=np.int64)
+        self.decks = np.zeros((num_games, 2, deck_capacity), dtype=np.int64)
+        self.deck_sizes = np.zeros((num_games, 2), dtype=np.int64)
+        self.current = np.zeros(num_games, dtype=np.int64)
+        self.turn = np.ones(num_games, dtype=np.int64)
+        self.status = np.zeros(num_games, dtype=np.int64)
+
+        self.record = record
+        self.history = []
+
+        all_games = np.arange(num_games)
+        for player in range(2):
+            self._refill_decks(all_games, np.full(num_games, player))
+            # Same order as Player.init_hand: cards are popped from the end of the deck
+            deck_size = len(self.deck_templates[player])
+            self.hands[:, player] = self.decks[:, player, deck_size - HAND_SIZE:deck_size][:, ::-1]
+            self.deck_sizes[:, player] -= HAND_SIZE
+
+    def _refill_decks(self, games: np.ndarray, players: np.ndarray) -> None:
+        """Fills the decks of the given (game, player) pairs with a fresh shuffle of their deck template."""
+        for player in range(2):
+            rows = games[players == player]
+            if len(rows) == 0:
+                continue
+            template = self.deck_templates[player]
+            order = np.argsort(self.rng.random((len(rows), len(template))), axis=1)
+            self.decks[rows, player, :len(template)] = template[order]
+            self.deck_sizes[rows, player] = len(template)
+
+    # === Queries ===
+
+    @property
+    def active(self) -> np.ndarray:
+        """Indices of games that are still running."""
+        return np.flatnonzero(self.status == 0)
+
+    def is_finished(self) -> bool:
+        return not np.any(self.status == 0)
+
+    def current_hands(self, games: np.ndarray) -> np.ndarray:
+        return self.hands[games, self.current[games]]
+
+    def playable_mask(self, games: np.ndarray) -> np.ndarray:
+        """(len(games), 8) mask of hand slots the current player can afford to play."""
+        hands = self.current_hands(games)
+        cards = np.maximum(hands, 0)
+        stock = self.resources[games[:, None], self.current[games][:, None], CARD_TABLES['resource'][cards], 1]
+        return (hands != EMPTY_SLOT) & (stock >= CARD_TABLES['cost'][cards])
+
+    # === Policies ===
+
+    def _pick_slots(self, mask: np.ndarray) -> np.ndarray:
+        """Picks a uniformly random True slot per row (rows must have at least one)."""
+        keys = np.where(mask, self.rng.random(mask.shape), -1.0)
+        return keys.argmax(axis=1)
+
+    def basic_moves(self, games: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """BasicAIPlayer policy: a random playable card, otherwise discard a random card."""
+        hands = self.current_hands(games)
+        playable = self.playable_mask(games)
+        discarded = ~playable.any(axis=1)
+        mask = np.where(discarded[:, None], hands != EMPTY_SLOT, playable)
+        slots = self._pick_slots(mask)
+        return hands[np.arange(len(games)), slots], discarded
+
+    def random_moves(self, games: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Uniform choice between all moves of Game.get_possible_moves."""
+        hands = self.current_hands(games)
+        mask = np.concatenate([self.playable_mask(games), hands != EMPTY_SLOT], axis=1)
+        choices = self._pick_slots(mask)
+        discarded = choices >= HAND_SIZE
+        return hands[np.arange(len(games)), choices % HAND_SIZE], discarded
+
+    # === Gameplay ===
+
+    def step(self, games: np.ndarray, cards: np.ndarray, discarded: np.ndarray) -> None:
+        """Applies one (card, discarded) move per listed game, following Game.apply_move."""
+        players = self.current[games]
+        opponents = 1 - players
+
+        played = ~discarded
+        self._use_card_effects(games[played], players[played], cards[played])
+        self.resources[games[played], players[played], CARD_TABLES['resource'][cards[played]], 1] -= CARD_TABLES['cost'][cards[played]]
+
+        self._discard_cards(games, players, cards)
+        self.resources[games, opponents, :, 1] += self.resources[games, opponents, :, 0]
+        self._set_game_status(games)
+
+        if self.record:
+            self._record_moves(games, players, cards, discarded)
+
+        ongoing = self.status[games] == 0
+        self._draw_cards(games[ongoing], players[ongoing])
+        self.current[games[ongoing]] = opponents[ongoing]
+        self.turn[games[ongoing]] += 1
+
+    def play(self, policy: str = 'basic', max_turns: int = 1000) -> np.ndarray:
+        """Plays all games to the end with the given policy ('basic' or 'random') and returns their statuses."""
+        choose_moves = self.basic_moves if policy == 'basic' else self.random_moves
+        for _ in range(max_turns):
+            games = self.active
+            if len(games) == 0:
+                break
+            cards, discarded = choose_moves(games)
+            self.step(games, cards, discarded)
+        return self.status
+
+    def _use_card_effects(self, games: np.ndarray, players: np.ndarray, cards: np.ndarray) -> None:
+        for action_index in range(CARD_TABLES['opcode'].shape[1]):
+            opcodes = CARD_TABLES['opcode'][cards, action_index]
+            values = CARD_TABLES['value'][cards, action_index]
+            targets = np.where(CARD_TABLES['target'][cards, action_index] == TARGET_ENEMY, 1 - players, players)
+
+            for opcode in np.unique(opcodes):
+                if opcode == NO_OP:
+                    continue
+                selected = opcodes == opcode
+                self._apply_action(int(opcode), games[selected], targets[selected], values[selected])
+
+    def _apply_action(self, opcode: int, games: np.ndarray, targets: np.ndarray, values: np.ndarray) -> None:
+        if opcode == OP_DAMAGE:
+            fence_damage = np.minimum(self.fence[games, targets], values)
+            self.fence[games, targets] = np.maximum(0, self.fence[games, targets] - fence_damage)
+            self.castle[games, targets] = np.maximum(0, self.castle[games, targets] - (values - fence_damage))
+        elif opcode == OP_CASTLE:
+            self.castle[games, targets] = np.maximum(0, self.castle[games, targets] + values)
+        elif opcode == OP_FENCE:
+            self.fence[games, targets] = np.maximum(0, self.fence[games, targets] + values)
+        elif opcode == OP_STACKS:
+            self.resources[games, targets, :, 1] = np.maximum(0, self.resources[games, targets, :, 1] + values[:, None])
+        elif opcode == OP_ALL:
+            self.castle[games, targets] = np.maximum(0, self.castle[games, targets] + values)
+            self.fence[games, targets] = np.maximum(0, self.fence[games, targets] + values)
+            self.resources[games, targets] = np.maximum(1, self.resources[games, targets] + values[:, None, None])
+        elif opcode == OP_TRANSFER:
+            amount = np.minimum(self.resources[games, targets, :, 1], values[:, None])
+            self.resources[games, targets, :, 1] -= amount
+            self.resources[games, 1 - targets, :, 1] += amount
+        else:
+            resource_type, idx = divmod(opcode - OP_RESOURCE, 2)
+            self.resources[games, targets, resource_type, idx] = np.maximum(0, self.resources[games, targets, resource_type, idx] + values)
+
+    def _discard_cards(self, games: np.ndarray, players: np.ndarray, cards: np.ndarray) -> None:
+        # Like Player.discard_card, the first slot holding the card is emptied
+        slots = (self.hands[games, players] == cards[:, None]).argmax(axis=1)
+        self.hands[games, players, slots] = EMPTY_SLOT
+
+    def _draw_cards(self, games: np.ndarray, players: np.ndarray) -> None:
+        empty = self.hands[games, players] == EMPTY_SLOT
+        drawing = empty.any(axis=1)
+        games, players, slots = games[drawing], players[drawing], empty[drawing].argmax(axis=1)
+
+        out_of_cards = self.deck_sizes[games, players] == 0
+        self._refill_decks(games[out_of_cards], players[out_of_cards])
+
+        self.deck_sizes[games, players] -= 1
+        self.hands[games, players, slots] = self.decks[games, players, self.deck_sizes[games, players]]
+
+    def _set_game_status(self, games: np.ndarray) -> None:
+        castle1, castle2 = self.castle[games, 0], self.castle[games, 1]
+        empty_hands = (self.hands[games] == EMPTY_SLOT).all(axis=(1, 2))
+
+        # Conditions are listed by increasing priority, matching the order of Game.set_game_status
+        status = np.zeros(len(games), dtype=np.int64)
+        status[empty_hands] = -1
+        status[castle2 <= 0] = 1
+        status[castle1 <= 0] = 2
+        status[castle2 >= 100] = 2
+        status[castle1 >= 100] = 1
+        status[(castle1 >= 100) & (castle2 >= 100)] = -1
+        status[(castle1 <= 0) & (castle2 <= 0)] = -1
+        self.status[games] = status
+
+    # === Logging ===
+
+    def _record_moves(self, games: np.ndarray, players: np.ndarray, cards: np.ndarray, discarded: np.ndarray) -> None:
+        """Stores the data GameLogger.log_move would write, taken after the move and before the draw."""
+        opponents = 1 - players
+        self.history.append({
+            'games': games,
+            'turn': self.turn[games],
+            'players': players,
+            'castle': self.castle[games],
+            'fence': self.fence[games],
+            'resources': self.resources[games].reshape(len(games), 2, 6),
+            'hands': self.hands[games, players],
+            'opponents': opponents,
+            'cards': cards,
+            'discarded': discarded,
+            'status': self.status[games],
+        })
+
+    def get_log_rows(self) -> list[list[list]]:
+        """Returns the recorded moves of every game as rows in the GameLogger column order."""
+        all_cards = DeckManager.load_all_cards()
+        rows = [[] for _ in range(self.num_games)]
+        for step in self.history:
+            for i, game in enumerate(step['games'].tolist()):
+                player, opponent = int(step['players'][i]), int(step['opponents'][i])
+                rows[game].append([
+                    int(step['turn'][i]),
+                    player + 1,
+                    opponent + 1,
+                    int(step['castle'][i, player]),
+                    int(step['fence'][i, player]),
+                    step['resources'][i, player].tolist(),
+                    [all_cards[card].id for card in step['hands'][i].tolist() if card != EMPTY_SLOT],
+                    int(step['castle'][i, opponent]),
+                    int(step['fence'][i, opponent]),
+                    step['resources'][i, opponent].tolist(),
+                    all_cards[int(step['cards'][i])].id,
+                    bool(step['discarded'][i]),
+                    int(step['status'][i]),
+                ])
+        return rows
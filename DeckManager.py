@@ -3,10 +3,14 @@ from pathlib import Path
 from typing import Union, Dict, Optional
 from models.Deck import Deck
 from models.Card import Card
+from models.CardEffect import compile_effect
 
 class DeckManager:
     _card_cache: Optional[list[Card]] = None
     _card_lookup: dict[str, Card] = {}
+    _card_index: dict[str, int] = {}
+    _deck_indices: dict[str, tuple[int, ...]] = {}
+    _compiled_effects: dict[str, tuple] = {}
 
     @staticmethod
     def _load_json(file_path: Path) -> Dict:
@@ -32,9 +36,17 @@ class DeckManager:
             material_type,
             card_info['cost'],
             card_info['name'],
-            card_info['effect']
+            card_info['effect'],
+            DeckManager._compile_effect(card_info['effect'])
         )
 
+    @staticmethod
+    def _compile_effect(effect: str) -> tuple:
+        """Compiles a card effect once and shares the result between all cards with that effect."""
+        if effect not in DeckManager._compiled_effects:
+            DeckManager._compiled_effects[effect] = compile_effect(effect)
+        return DeckManager._compiled_effects[effect]
+
     @staticmethod
     def get_card_by_id(card_id: str) -> Card:
         """Fetches a Card object using its ID from the base card data."""
@@ -42,6 +54,13 @@ class DeckManager:
             DeckManager.load_all_cards()
         return DeckManager._card_lookup[card_id]
 
+    @staticmethod
+    def get_card_index(card_id: str) -> int:
+        """Returns the position of a card in the list returned by load_all_cards()."""
+        if DeckManager._card_cache is None:
+            DeckManager.load_all_cards()
+        return DeckManager._card_index[card_id]
+
     @staticmethod
     def load_all_cards() -> list[Card]:
         """Loads all cards from cards.json and returns a list of Card objects."""
@@ -55,6 +74,7 @@ class DeckManager:
             for index, card_info in enumerate(card_list):
                 card_id = f"{material_type}:{index}"
                 card = DeckManager._create_card(card_id, card_info)
+                DeckManager._card_index[card_id] = len(all_cards)
                 all_cards.append(card)
                 DeckManager._card_lookup[card_id] = card
 
@@ -88,6 +108,15 @@ class DeckManager:
         deck_obj = Deck(deck)
         return deck_obj
 
+    @staticmethod
+    def load_deck_indices(deck_file: Union[str, Path]) -> tuple[int, ...]:
+        """Loads a deck from a file and returns the sorted card indices it contains (cached per file)."""
+        key = str(deck_file)
+        if key not in DeckManager._deck_indices:
+            deck = DeckManager.load_deck(deck_file)
+            DeckManager._deck_indices[key] = tuple(sorted(DeckManager.get_card_index(card.id) for card in deck.cards))
+        return DeckManager._deck_indices[key]
+
     @staticmethod
     def save_deck(deck_dict: dict, deck_file: Union[str, Path]) -> None:
         """Saves the deck configuration to a file."""
@@ -3,7 +3,9 @@ from models.HumanPlayer import HumanPlayer
 from models.AIPlayer import AIPlayer
 from models.BasicAIPlayer import BasicAIPlayer
 from models.Card import Card
+from models.CardEffect import OP_DAMAGE, OP_CASTLE, OP_FENCE, OP_STACKS, OP_ALL, OP_TRANSFER, OP_RESOURCE, TARGET_ENEMY
 from DeckManager import DeckManager
+from models.Zobrist import CARD_COUNT, hash_features
 from utils.GameLogger import GameLogger
 from typing import Union, Tuple, Optional
 
@@ -16,6 +18,9 @@ class Game:
         self.game_mode = 0
         self.turn_count = 1
 
+        # Zobrist hash of the position (see models.Zobrist), computed when first read after a change
+        self._zobrist_hash: Optional[int] = None
+
         self.all_cards = DeckManager.load_all_cards()
 
     def setup_game(
@@ -30,6 +35,7 @@ class Game:
 
         game_modes = {'singleplayer': 1, 'multiplayer': 2, 'cpu_only': 3}
         self.game_mode = game_modes.get(mode, 0)
+        self.reset_hash()
 
     def setup_singleplayer(
         self, default_player_names: list,
@@ -74,6 +80,7 @@ class Game:
         """Apply the given move to the game state."""
         card, discarded = move
         assert self.current_player is not None
+        player = self.current_player
 
         # Apply card effect if not discarded
         if not discarded:
@@ -96,23 +103,37 @@ class Game:
             self.current_player.draw_card()
             self.change_current_player()
 
+        self.reset_hash()
+        self.notify_players(player, card, discarded)
+
+    def notify_players(self, player, card, discarded: bool) -> None:
+        """Lets AI players follow a move of player that was just applied."""
+        ai_players = [p for p in (self.player1, self.player2) if isinstance(p, AIPlayer) and p.observes_moves()]
+        if not ai_players:
+            return
+        game_state = self.to_state()
+        for ai_player in ai_players:
+            ai_player.observe_move(player.id, card, discarded, game_state)
+
     def update_resources(self, player) -> None:
         for resource in player.resources:
             resource[1] += resource[0]
 
-    def apply_action_to_player(self, target_player, action, action_value) -> None:
-        if 'attack' in action:
+    def apply_action_to_player(self, target_player, opcode, action_value) -> None:
+        if opcode == OP_DAMAGE:
             target_player.receive_damage(action_value)
-        elif 'castle' in action:
+        elif opcode == OP_CASTLE:
             target_player.add_to_castle_hp(action_value)
-        elif 'fence' in action:
+        elif opcode == OP_FENCE:
             target_player.add_to_fence_hp(action_value)
-        elif 'stacks' in action:
+        elif opcode == OP_STACKS:
             target_player.add_to_stacks(action_value)
-        elif 'all' in action:
+        elif opcode == OP_ALL:
             target_player.add_to_all(action_value)
+        elif opcode == OP_TRANSFER:
+            target_player.transfer_resources(self.get_other_player(target_player), action_value)
         else:
-            target_player.add_to_resource_based_on_action(action, action_value)
+            target_player.add_to_resource(*divmod(opcode - OP_RESOURCE, 2), action_value)
 
     def get_other_player(self, player) -> Union[HumanPlayer, AIPlayer]:
         if self.player1 is None or self.player2 is None:
@@ -122,13 +143,43 @@ class Game:
 
     def change_current_player(self):
         self.current_player = self.get_other_player(self.current_player)
+        self.reset_hash()
         self.turn_count += 1
 
-    def get_action_target_player(self, player, action):
+    def get_hash_feature_values(self) -> list[int]:
+        """Feature vector hashed by models.Zobrist, laid out like GameState.hash_feature_values."""
+        if self.player1 is None or self.player2 is None:
+            raise ValueError('Player cannot be None')
+
+        players = (self.player1, self.player2)
+        hand_counts = [0] * (2 * CARD_COUNT)
+        for idx, player in enumerate(players):
+            for card in player.hand:
+                if card is not None:
+                    hand_counts[idx * CARD_COUNT + DeckManager.get_card_index(card.id)] += 1
+
+        return (
+            [player.castle_hp for player in players]
+            + [player.fence_hp for player in players]
+            + [value for player in players for resource in player.resources for value in resource]
+            + hand_counts
+        )
+
+    @property
+    def zobrist_hash(self) -> int:
+        if self._zobrist_hash is None:
+            self._zobrist_hash = hash_features(self.get_hash_feature_values(), 0 if self.current_player is self.player1 else 1)
+        return self._zobrist_hash
+
+    def reset_hash(self) -> None:
+        """Drops the cached Zobrist hash, call it after changing the players outside apply_move."""
+        self._zobrist_hash = None
+
+    def get_action_target_player(self, player, target):
         if player is None:
             raise ValueError('Player cannot be None')
 
-        if 'enemy' in action or 'attack' in action:
+        if target == TARGET_ENEMY:
             return self.get_other_player(player)
         else:
             return player
@@ -156,21 +207,10 @@ class Game:
         return possible_moves
 
     def use_card_effect(self, player, card):
-        actions = card.effect.split(';')  # Handle multiple actions separately
-        for action in actions:
-            action_parts = action.split(' ')
-
-            # Get the keyword (e.g., "castle", "attack", "fence")
-            keyword = action_parts[0]
-            action_value = card.get_effect_value(keyword)
-
-            action_target_player = self.get_action_target_player(player, action_parts[:-1])
-
-            if 'transfer' in action:
-                other_player = self.get_other_player(action_target_player)
-                action_target_player.transfer_resources(other_player, action_value)
-            else:
-                self.apply_action_to_player(action_target_player, action, action_value)
+        # Effects are compiled into (opcode, target, value) records when the cards are loaded
+        for opcode, target, action_value in card.actions:
+            action_target_player = self.get_action_target_player(player, target)
+            self.apply_action_to_player(action_target_player, opcode, action_value)
 
     def set_game_status(self):
         if self.player1 is None or self.player2 is None:
@@ -229,4 +269,5 @@ class Game:
             raise ValueError("Invalid current_player ID in state")
 
         game.game_status = state['game_status']
+        game.reset_hash()
         return game
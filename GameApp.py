@@ -1,6 +1,8 @@
+from functools import partial
 from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QWidget
 from models.HumanPlayer import HumanPlayer
 from models.RuleBasedAIPlayer import RuleBasedAIPlayer
+from models.MCTSAIPlayer import MCTSAIPlayer
 from views.MainMenuView import MainMenuView
 from views.GameView import GameView
 from views.DeckManagerView import DeckManagerView
@@ -26,6 +28,11 @@ class GameApp(QMainWindow):
         self.current_view = MainMenuView(self, self.start_sp_game, self.start_mp_game, self.start_cpu_game, self.show_deck_manager)
         self.layout.addWidget(self.current_view)
         
+    def closeEvent(self, event) -> None:
+        if isinstance(self.current_view, GameView):
+            self.current_view.stop_ai_workers()
+        super().closeEvent(event)
+
     def switch_view(self, new_view, *args, **kwargs) -> None:
         self.layout.removeWidget(self.current_view)
         self.current_view.deleteLater()
@@ -44,6 +51,9 @@ class GameApp(QMainWindow):
 
     def start_sp_game(self, selected_ai_model_text: str, selected_ai_deck: str, is_player_first: bool) -> None:
         selected_ai_model = GameResourcesManager.resolve_ai_model(selected_ai_model_text)
+        if issubclass(selected_ai_model, MCTSAIPlayer):
+            # Search based opponents think during the human's turn and keep their moves within the time limit
+            selected_ai_model = partial(selected_ai_model, time_limit=self.config.ai_move_time_limit, ponder=True)
         default_player_names = [self.config.default_player_name, self.config.default_cpu_name]
         preferred_player_deck = self.config.preferred_deck
 
@@ -100,15 +110,23 @@ class GameApp(QMainWindow):
         if self.game_logger is not None:
             self.game_logger.log_move(self.game_instance, card, discarded)
 
-        self.game_instance.current_player.draw_card()
+        player = self.game_instance.current_player
+        player.draw_card()
+        self.game_instance.reset_hash()
+
+        # Like Game.apply_move, AI players observe the position with the next player to move
+        if self.game_instance.game_status == 0:
+            self.game_instance.change_current_player()
+        self.game_instance.notify_players(player, card, discarded)
 
         self.current_view.handle_game_status(self.game_instance.game_status)
 
         if self.game_instance.game_status == 0:
-            self.game_instance.change_current_player()
             self.current_view.update_current_turn_marker()
             self.current_view.clear_hand_display()
             self.current_view.start_turn()
 
     def back_to_main_menu(self) -> None:
+        if isinstance(self.current_view, GameView):
+            self.current_view.stop_ai_workers()
         self.switch_view(MainMenuView, self.start_sp_game, self.start_mp_game, self.start_cpu_game, self.show_deck_manager)
@@ -1,5 +1,5 @@
 import configparser
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 class Config:
     def __init__(self, file_path='config/config.ini'):
@@ -65,6 +65,11 @@ class Config:
     def preferred_deck(self) -> str:
         return self.config.get('Player', 'PreferredDeck', fallback='default_deck_json')
 
+    @property
+    def ai_move_time_limit(self) -> Optional[float]:
+        """Seconds a search based AI may spend on a move in the GUI, None for no limit."""
+        return self.config.getfloat('AI', 'MoveTimeLimit', fallback=None)
+
     @property
     def enable_logs(self) -> bool:
         return self.config.getboolean('Logs', 'EnableLogs')
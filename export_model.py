@@ -0,0 +1,116 @@
+import time
+import torch
+import torch.nn as nn
+from pathlib import Path
+from models.MoveDataset import MemmapMoveDataset, batch_loader
+from models.ValueNet import load_inference_model, ValueNet
+from models.NumpyValueNet import NumpyValueNet
+from train import split_dataset
+from argparse import ArgumentParser
+
+FORMATS = ('torchscript', 'int8', 'npz')
+FORMAT_SUFFIXES = {'torchscript': '.ts.pt', 'int8': '.int8.pt', 'npz': '.npz'}
+INPUT_SIZE = 78
+
+def load_float_model(model_path: str) -> ValueNet:
+    model = ValueNet()
+    model.load_state_dict(torch.load(model_path, map_location='cpu'))
+    return model.eval()
+
+def export_torchscript(model: nn.Module, path: Path) -> None:
+    """Scripts and freezes the model. Freezing folds the weights into the graph, so linear layers and ReLUs can be fused."""
+    scripted = torch.jit.optimize_for_inference(torch.jit.freeze(torch.jit.script(model)))
+    torch.jit.save(scripted, path)
+
+def export_int8(model: nn.Module, path: Path) -> None:
+    """Quantizes the weights of the linear layers to int8 (activations are quantized on the fly) and saves it as TorchScript."""
+    quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    torch.jit.save(torch.jit.freeze(torch.jit.script(quantized)), path)
+
+def export(model_path: str, formats: list[str]) -> dict[str, Path]:
+    model = load_float_model(model_path)
+    paths = {}
+    for export_format in formats:
+        path = Path(model_path).with_suffix(FORMAT_SUFFIXES[export_format])
+        if export_format == 'torchscript':
+            export_torchscript(model, path)
+        elif export_format == 'int8':
+            export_int8(model, path)
+        else:
+            NumpyValueNet(model.state_dict()).save(path)
+        paths[export_format] = path
+        print(f'Exported {export_format} model to {path}')
+    return paths
+
+def load_exports(model_path: str, paths: dict[str, Path]) -> dict:
+    """The float model and every export as a function from a float32 tensor batch to values."""
+    models = {'float': load_float_model(model_path)}
+    for export_format, path in paths.items():
+        if export_format == 'npz':
+            numpy_model = NumpyValueNet.load(path)
+            models[export_format] = lambda inputs: torch.from_numpy(numpy_model(inputs.numpy()))
+        else:
+            models[export_format] = load_inference_model(path)
+
+    compile_model = getattr(torch, 'compile', None)
+    if compile_model is not None:
+        try:
+            compiled = compile_model(load_float_model(model_path))
+            with torch.no_grad():
+                compiled(torch.zeros(1, INPUT_SIZE))  # Compiles ahead of the measurements
+            models['compiled'] = compiled
+        except Exception as e:
+            print(f'torch.compile is not available here: {e}')
+    return models
+
+def check_accuracy(models: dict, csv_file: str) -> None:
+    """Compares every model with the float one on the held-out split of train.py."""
+    _, val_dataset = split_dataset(MemmapMoveDataset(csv_file))
+    val_loader = batch_loader(val_dataset, 1024)
+    criterion = nn.MSELoss(reduction='sum')
+
+    print(f'{"Model":<12}{"Val loss":>10}{"Direction":>11}{"Max diff":>10}')
+    with torch.no_grad():
+        for name, model in models.items():
+            val_loss = 0.0
+            correct = 0
+            max_diff = 0.0
+            for inputs, labels in val_loader:
+                outputs = model(inputs)
+                reference = models['float'](inputs)
+                val_loss += criterion(outputs, labels).item()
+                correct += ((outputs > 0) == (labels > 0)).sum().item()
+                max_diff = max(max_diff, (outputs - reference).abs().max().item())
+            print(f'{name:<12}{val_loss / len(val_dataset):>10.4f}{correct / len(val_dataset) * 100:>10.2f}%{max_diff:>10.5f}')
+
+def measure_throughput(models: dict, batch_sizes: tuple[int, ...] = (1, 16), repeats: int = 2000) -> None:
+    """Prints the evaluations per second of every model, for the batch sizes used by the search."""
+    print(f'{"Model":<12}' + ''.join(f'{f"batch {size}":>14}' for size in batch_sizes))
+    with torch.no_grad():
+        for name, model in models.items():
+            rates = []
+            for batch_size in batch_sizes:
+                inputs = torch.rand(batch_size, INPUT_SIZE)
+                model(inputs)
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    model(inputs)
+                rates.append(batch_size * repeats / (time.perf_counter() - start))
+            print(f'{name:<12}' + ''.join(f'{rate:>11.0f}/s' for rate in rates))
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('-model', type=str, default='value_net.pth', help='path to the trained model .pth file')
+    parser.add_argument('-formats', type=str, nargs='+', choices=FORMATS, default=list(FORMATS), help='inference artifacts to export next to the model')
+    parser.add_argument('-data', type=str, default='move_data.csv', help='move data for the accuracy check on the held-out split')
+    parser.add_argument('--skip_check', action='store_true', help='only export, without the accuracy and throughput check')
+    args = parser.parse_args()
+
+    paths = export(args.model, args.formats)
+    if not args.skip_check:
+        models = load_exports(args.model, paths)
+        if Path(args.data).exists():
+            check_accuracy(models, args.data)
+        else:
+            print(f'{args.data} not found, skipping the accuracy check')
+        measure_throughput(models)
@@ -1,9 +1,24 @@
-import torch
+import math
 import numpy as np
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 from ml_utils.feature_constants import FEATURE_STATS
+from models.GameState import GameState, HAND_SIZE, EMPTY_SLOT
+from DeckManager import DeckManager
+
+if TYPE_CHECKING:
+    import torch
 
 NUM_CARDS = 30
+NUM_FEATURES = 78
+
+# Offsets of the feature groups in the network input, in the order of build_feature_vector
+PLAYER_HAND_OFFSET = 3
+OPPONENT_CASTLE_OFFSET = PLAYER_HAND_OFFSET + NUM_CARDS
+PLAYER_RESOURCES_OFFSET = OPPONENT_CASTLE_OFFSET + 2
+OPPONENT_RESOURCES_OFFSET = PLAYER_RESOURCES_OFFSET + 6
+CARD_PLAYED_OFFSET = OPPONENT_RESOURCES_OFFSET + 6
+IS_DISCARDED_OFFSET = CARD_PLAYED_OFFSET + NUM_CARDS
+RESOURCE_DIVISORS = (5.0, 40.0, 5.0, 40.0, 5.0, 40.0)  # Same normalization as normalize_resources
 
 def card_str_to_id(card: str) -> int:
     try:
@@ -12,7 +27,8 @@ def card_str_to_id(card: str) -> int:
     except Exception:
         return 0
 
-def card_str_to_one_hot(card: str) -> torch.Tensor:
+def card_str_to_one_hot(card: str) -> 'torch.Tensor':
+    import torch
     card_id = card_str_to_id(card)
     one_hot = torch.zeros(NUM_CARDS, dtype=torch.float32)
     if 0 <= card_id < NUM_CARDS:
@@ -35,7 +51,13 @@ def normalize_resources(res: list[int]) -> list[float]:
         for i, val in enumerate(res)
     ]
 
-def build_feature_tensor(features: dict) -> torch.Tensor:
+def build_feature_vector(features: dict) -> np.ndarray:
+    """Builds the float32 network input from a feature dictionary, without torch."""
+    card_one_hot = [0.0] * NUM_CARDS
+    card_id = card_str_to_id(features['Card Played'])
+    if 0 <= card_id < NUM_CARDS:
+        card_one_hot[card_id] = 1.0
+
     vec = [
         features['Turn'] / 60.0,
         features['Player Castle HP'] / 100.0,
@@ -45,10 +67,14 @@ def build_feature_tensor(features: dict) -> torch.Tensor:
         np.log1p(features['Opponent Fence HP']),
         *normalize_resources(features['Player Resources']),
         *normalize_resources(features['Opponent Resources']),
-        *card_str_to_one_hot(features['Card Played']),
+        *card_one_hot,
         float(features['Is discarded']),
     ]
-    return torch.tensor(vec, dtype=torch.float32)
+    return np.array(vec, dtype=np.float32)
+
+def build_feature_tensor(features: dict) -> 'torch.Tensor':
+    import torch
+    return torch.from_numpy(build_feature_vector(features))
 
 def extract_features_from_state(state: dict, move: Tuple) -> dict:
     """
@@ -73,3 +99,62 @@ def extract_features_from_state(state: dict, move: Tuple) -> dict:
         'Card Played': move[0].id,
         'Is discarded': move[1]
     }
+
+def extract_features_from_game_state(state: GameState, move: Tuple) -> dict:
+    """
+    Converts a compact GameState and a (card index, discarded) move into a flat dictionary for the value network.
+    """
+    all_cards = DeckManager.load_all_cards()
+    player = state.current
+    opponent = 1 - player
+
+    return {
+        'Turn': state.turn,
+        'Player Castle HP': state.castle[player],
+        'Player Fence HP': state.fence[player],
+        'Player Hand': [all_cards[card].id for card in state.get_hand(player)],
+        'Opponent Castle HP': state.castle[opponent],
+        'Opponent Fence HP': state.fence[opponent],
+        'Player Resources': state.resources[player * 6:player * 6 + 6],
+        'Opponent Resources': state.resources[opponent * 6:opponent * 6 + 6],
+        'Card Played': all_cards[move[0]].id,
+        'Is discarded': move[1]
+    }
+
+def _card_feature_ids() -> tuple[int, ...]:
+    ids = []
+    for card in DeckManager.load_all_cards():
+        card_id = card_str_to_id(card.id)
+        ids.append(card_id if 0 <= card_id < NUM_CARDS else -1)
+    return tuple(ids)
+
+CARD_FEATURE_IDS = _card_feature_ids()  # Hand and one-hot position of every card index, -1 outside the one-hot
+
+def encode_game_state(state: GameState, move: int, out: np.ndarray) -> None:
+    """
+    Writes the network input of a compact GameState and a move code into out, a float32 row of
+    NUM_FEATURES values. Gives the same values as build_feature_vector(extract_features_from_game_state(...))
+    without building the feature dictionary.
+    """
+    player = state.current
+    opponent = 1 - player
+    castle, fence, resources = state.castle, state.fence, state.resources
+    card_ids = CARD_FEATURE_IDS
+
+    out.fill(0.0)
+    hand_base = player * HAND_SIZE
+    for card in state.hands[hand_base:hand_base + HAND_SIZE]:
+        if card != EMPTY_SLOT:
+            out[PLAYER_HAND_OFFSET + max(card_ids[card], 0)] += 1.0
+    out[0:PLAYER_HAND_OFFSET] = (state.turn / 60.0, castle[player] / 100.0, math.log1p(fence[player]))
+    out[OPPONENT_CASTLE_OFFSET:CARD_PLAYED_OFFSET] = (
+        castle[opponent] / 100.0,
+        math.log1p(fence[opponent]),
+        *[value / divisor for value, divisor in zip(resources[player * 6:player * 6 + 6], RESOURCE_DIVISORS)],
+        *[value / divisor for value, divisor in zip(resources[opponent * 6:opponent * 6 + 6], RESOURCE_DIVISORS)],
+    )
+
+    card_id = card_ids[move >> 1]
+    if card_id >= 0:
+        out[CARD_PLAYED_OFFSET + card_id] = 1.0
+    out[IS_DISCARDED_OFFSET] = move & 1
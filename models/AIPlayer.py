@@ -1,4 +1,5 @@
 from models.Player import Player
+from models.Card import Card
 from typing import NoReturn, Union, Optional
 from pathlib import Path
 
@@ -8,3 +9,15 @@ class AIPlayer(Player):
 
     def take_turn(self, game_state: dict) -> NoReturn:
         raise NotImplementedError('Subclasses must implement this method')
+
+    def close(self) -> None:
+        """Releases resources held by the AI between moves (e.g. worker pools). Does nothing by default."""
+        pass
+
+    def observes_moves(self) -> bool:
+        """Whether observe_move needs to be called. False by default, so the game doesn't build states for it."""
+        return False
+
+    def observe_move(self, player_id: int, card: Card, discarded: bool, game_state: dict) -> None:
+        """Called after every move applied to the game, with the resulting state. Does nothing by default."""
+        pass
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from resources.resource_names import resource_names
 
 @dataclass(frozen=True)
@@ -8,6 +8,7 @@ class Card:
     cost: int
     name: str
     effect: str
+    actions: tuple = field(default=(), compare=False, repr=False)  # Compiled effect, see models.CardEffect
     
     def is_playable(self, player_resources) -> bool:
         # Ensure material_type is treated as an integer when accessing player_resources
@@ -0,0 +1,49 @@
+from resources.resource_names import resource_names
+
+# Opcodes of compiled card actions
+OP_DAMAGE = 0
+OP_CASTLE = 1
+OP_FENCE = 2
+OP_STACKS = 3
+OP_ALL = 4
+OP_TRANSFER = 5
+OP_RESOURCE = 6  # OP_RESOURCE + resource_type * 2 + k, k = 0 for income and k = 1 for stock
+
+# Action targets, relative to the player using the card
+TARGET_SELF = 0
+TARGET_ENEMY = 1
+
+def _resource_opcode(keywords: list[str]) -> int:
+    for resource_type, resource_info in resource_names.items():
+        for idx, resource_name in enumerate(resource_info):
+            if resource_name in keywords:
+                return OP_RESOURCE + int(resource_type) * 2 + idx
+    raise ValueError(f'Invalid action "{" ".join(keywords)}" not found in resource names: {list(resource_names.keys())}')
+
+def compile_action(action: str) -> tuple[int, int, int]:
+    """Compiles a single action (e.g. "enemy castle -4") into an (opcode, target, operand) record."""
+    action_parts = action.split()
+    keywords = action_parts[:-1]
+    operand = int(action_parts[-1])  # Handles "+3", "-4" and unsigned values
+    target = TARGET_ENEMY if 'enemy' in keywords or 'attack' in keywords else TARGET_SELF
+
+    if 'transfer' in keywords:
+        opcode = OP_TRANSFER
+    elif 'attack' in keywords:
+        opcode = OP_DAMAGE
+    elif 'castle' in keywords:
+        opcode = OP_CASTLE
+    elif 'fence' in keywords:
+        opcode = OP_FENCE
+    elif 'stacks' in keywords:
+        opcode = OP_STACKS
+    elif 'all' in keywords:
+        opcode = OP_ALL
+    else:
+        opcode = _resource_opcode(keywords)
+
+    return opcode, target, operand
+
+def compile_effect(effect: str) -> tuple[tuple[int, int, int], ...]:
+    """Compiles a card effect string into a tuple of (opcode, target, operand) records, one per action."""
+    return tuple(compile_action(action) for action in effect.split(';'))
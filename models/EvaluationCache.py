@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+CacheKey = Tuple[int, int, int]  # (Zobrist hash, turn, move code) of an evaluated position
+
+class EvaluationCache:
+    """
+    Bounded map from positions and moves to network values with least-recently-used replacement.
+
+    Keys hold the Zobrist hash of the state, which covers everything the network sees except
+    the turn number, the turn and the move code. A lock keeps it usable from several search threads.
+    """
+    def __init__(self, capacity: int = 100000) -> None:
+        if capacity < 1:
+            raise ValueError('Evaluation cache capacity must be positive')
+        self.capacity = capacity
+        self.entries: OrderedDict[CacheKey, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: CacheKey) -> Optional[float]:
+        """Returns the value stored for key, marking it as recently used."""
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: CacheKey, value: float) -> None:
+        """Stores a value, evicting the least recently used one when the cache is full."""
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
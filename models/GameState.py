@@ -0,0 +1,364 @@
+from random import shuffle
+from DeckManager import DeckManager
+from models.MoveGenerator import MoveGenerator, decode_move
+from models.Zobrist import CASTLE_FEATURE, FENCE_FEATURE, RESOURCE_FEATURE, HAND_FEATURE, CARD_COUNT, SIDE_TO_MOVE_KEY, hash_features, update_hash, zobrist_key
+from models.CardEffect import OP_DAMAGE, OP_CASTLE, OP_FENCE, OP_STACKS, OP_ALL, OP_TRANSFER, OP_RESOURCE, TARGET_ENEMY
+from resources.resource_names import resource_names
+
+HAND_SIZE = 8
+EMPTY_SLOT = -1
+
+# Per card index lookup tables, built once from the compiled card data
+_ALL_CARDS = DeckManager.load_all_cards()
+CARD_ACTIONS = tuple(card.actions for card in _ALL_CARDS)
+CARD_COSTS = tuple(card.cost for card in _ALL_CARDS)
+CARD_STOCK_OFFSETS = tuple(int(card.material_type) * 2 + 1 for card in _ALL_CARDS)  # Offset of the paid stock within a player's resources
+MOVE_GENERATOR = MoveGenerator(_ALL_CARDS)
+
+class GameState:
+    """
+    Compact, fixed-layout game state used by search and simulation code.
+
+    Players are addressed by index (0 for player1, 1 for player2). Cards are indices into
+    DeckManager.load_all_cards(), empty hand slots are -1. Resources are stored flat as
+    resources[player * 6 + resource_type * 2 + k] with k = 0 for income and k = 1 for stock.
+    Decks are immutable tuples drawn from the end, so copies share them.
+    Moves are integer codes (see models.MoveGenerator.encode_move). The Zobrist hash of the
+    position (castle/fence, resources, hand multisets and side to move) is kept up to date by
+    every mutation, so all writes to those fields go through the _set_* helpers.
+    """
+    __slots__ = (
+        'castle', 'fence', 'resources', 'hands', 'decks', 'deck_sizes',
+        'deck_templates', 'current', 'turn', 'status', 'game_mode',
+        'mask_stocks', 'resource_masks', 'hash',
+    )
+
+    def __init__(self) -> None:
+        self.castle = [30, 30]
+        self.fence = [10, 10]
+        self.resources = [2, 5] * 6
+        self.hands = [EMPTY_SLOT] * (2 * HAND_SIZE)
+        self.decks = [(), ()]
+        self.deck_sizes = [0, 0]
+        self.deck_templates = ((), ())
+        self.current = 0
+        self.turn = 1
+        self.status = 0
+        self.game_mode = 0
+
+        # Playable card masks per (player, resource type), refreshed only when the matching stock changes
+        self.mask_stocks = [-1] * 6
+        self.resource_masks = [0] * 6
+
+        self.hash = self.compute_hash()
+
+    # === Construction ===
+
+    @classmethod
+    def from_game(cls, game) -> 'GameState':
+        """Builds a compact state from a running Game, keeping the real deck order."""
+        if game.player1 is None or game.player2 is None or game.current_player is None:
+            raise ValueError("Players or current player have not been initialized properly.")
+
+        state = cls()
+        players = (game.player1, game.player2)
+        for idx, player in enumerate(players):
+            deck_cards = [DeckManager.get_card_index(card.id) for card in player.deck.cards]
+            hand = [DeckManager.get_card_index(card.id) for card in player.hand if card is not None]
+            state._set_player(idx, player.castle_hp, player.fence_hp, player.resources, hand, deck_cards)
+
+        state.deck_templates = tuple(DeckManager.load_deck_indices(player.preferred_deck_file) for player in players)
+        state.current = 0 if game.current_player is game.player1 else 1
+        state.turn = game.turn_count
+        state.status = game.game_status
+        state.game_mode = game.game_mode
+        state.hash = state.compute_hash()
+        return state
+
+    @classmethod
+    def from_state(cls, state_dict: dict) -> 'GameState':
+        """Builds a compact state from Game.to_state(). Decks are reshuffled like Deck.from_state."""
+        state = cls()
+        players = (state_dict['player1'], state_dict['player2'])
+        for idx, player in enumerate(players):
+            deck_cards = [DeckManager.get_card_index(card_id) for card_id in player['deck']['cards']] if player.get('deck') else []
+            shuffle(deck_cards)
+            hand = [DeckManager.get_card_index(card['id']) for card in player.get('hand', [])]
+            state._set_player(idx, player['castle_hp'], player['fence_hp'], player['resources'], hand, deck_cards)
+
+        state.deck_templates = tuple(DeckManager.load_deck_indices(player['preferred_deck_file']) for player in players)
+        if state_dict['current_player_id'] == players[0]['id']:
+            state.current = 0
+        elif state_dict['current_player_id'] == players[1]['id']:
+            state.current = 1
+        else:
+            raise ValueError("Invalid current_player ID in state")
+        state.turn = state_dict['turn_count']
+        state.status = state_dict['game_status']
+        state.game_mode = state_dict['game_mode']
+        state.hash = state.compute_hash()
+        return state
+
+    def _set_player(self, player: int, castle_hp: int, fence_hp: int, resources: list, hand: list[int], deck_cards: list[int]) -> None:
+        self.castle[player] = castle_hp
+        self.fence[player] = fence_hp
+        base = player * 6
+        for resource_type, (income, stock) in enumerate(resources):
+            self.resources[base + resource_type * 2] = income
+            self.resources[base + resource_type * 2 + 1] = stock
+        hand_base = player * HAND_SIZE
+        for slot, card in enumerate(hand[:HAND_SIZE]):
+            self.hands[hand_base + slot] = card
+        self.decks[player] = tuple(deck_cards)
+        self.deck_sizes[player] = len(deck_cards)
+
+    def copy(self) -> 'GameState':
+        """Returns an independent copy. Only the small fixed-size lists are duplicated."""
+        new = GameState.__new__(GameState)
+        new.castle = self.castle[:]
+        new.fence = self.fence[:]
+        new.resources = self.resources[:]
+        new.hands = self.hands[:]
+        new.decks = self.decks[:]
+        new.deck_sizes = self.deck_sizes[:]
+        new.deck_templates = self.deck_templates
+        new.current = self.current
+        new.turn = self.turn
+        new.status = self.status
+        new.game_mode = self.game_mode
+        new.mask_stocks = self.mask_stocks[:]
+        new.resource_masks = self.resource_masks[:]
+        new.hash = self.hash
+        return new
+
+    def determinize(self, observer: int) -> 'GameState':
+        """
+        Returns a copy with the information hidden from observer sampled again: the opponent's
+        hand is dealt from the cards left in its hand and deck, and both deck orders are reshuffled.
+        """
+        state = self.copy()
+        opponent = 1 - observer
+        base = opponent * HAND_SIZE
+        unseen = self.get_hand(opponent) + list(self.decks[opponent][:self.deck_sizes[opponent]])
+        shuffle(unseen)
+        for slot in range(HAND_SIZE):
+            if self.hands[base + slot] != EMPTY_SLOT:
+                state._set_hand_slot(opponent, slot, unseen.pop())
+        state.decks[opponent] = tuple(unseen)
+        state.deck_sizes[opponent] = len(unseen)
+
+        own_deck = list(self.decks[observer][:self.deck_sizes[observer]])
+        shuffle(own_deck)
+        state.decks[observer] = tuple(own_deck)
+        state.deck_sizes[observer] = len(own_deck)
+        return state
+
+    # === Hashing ===
+
+    def hash_feature_values(self) -> list[int]:
+        """Feature vector hashed by models.Zobrist, in feature id order."""
+        hand_counts = [0] * (2 * CARD_COUNT)
+        for slot, card in enumerate(self.hands):
+            if card != EMPTY_SLOT:
+                hand_counts[slot // HAND_SIZE * CARD_COUNT + card] += 1
+        return self.castle + self.fence + self.resources + hand_counts
+
+    def compute_hash(self) -> int:
+        """Computes the Zobrist hash from scratch."""
+        return hash_features(self.hash_feature_values(), self.current)
+
+    def _set_castle(self, player: int, value: int) -> None:
+        old_value = self.castle[player]
+        if old_value != value:
+            self.hash ^= zobrist_key(CASTLE_FEATURE + player, old_value) ^ zobrist_key(CASTLE_FEATURE + player, value)
+            self.castle[player] = value
+
+    def _set_fence(self, player: int, value: int) -> None:
+        old_value = self.fence[player]
+        if old_value != value:
+            self.hash ^= zobrist_key(FENCE_FEATURE + player, old_value) ^ zobrist_key(FENCE_FEATURE + player, value)
+            self.fence[player] = value
+
+    def _set_resource(self, idx: int, value: int) -> None:
+        old_value = self.resources[idx]
+        if old_value != value:
+            self.hash ^= zobrist_key(RESOURCE_FEATURE + idx, old_value) ^ zobrist_key(RESOURCE_FEATURE + idx, value)
+            self.resources[idx] = value
+
+    def _set_hand_slot(self, player: int, slot: int, card: int) -> None:
+        """Replaces the card in a hand slot, updating the hash of the card counts involved."""
+        base = player * HAND_SIZE
+        hand = self.hands[base:base + HAND_SIZE]
+        old_card = hand[slot]
+        if old_card != EMPTY_SLOT:
+            count = hand.count(old_card)
+            self.hash = update_hash(self.hash, HAND_FEATURE + player * CARD_COUNT + old_card, count, count - 1)
+            hand[slot] = EMPTY_SLOT
+        if card != EMPTY_SLOT:
+            count = hand.count(card)
+            self.hash = update_hash(self.hash, HAND_FEATURE + player * CARD_COUNT + card, count, count + 1)
+        self.hands[base + slot] = card
+
+    # === Queries ===
+
+    @property
+    def current_player_id(self) -> int:
+        return self.current + 1
+
+    def get_hand(self, player: int) -> list[int]:
+        """Returns the non-empty hand slots of the player as card indices."""
+        base = player * HAND_SIZE
+        return [card for card in self.hands[base:base + HAND_SIZE] if card != EMPTY_SLOT]
+
+    def is_playable(self, player: int, card: int) -> bool:
+        return self.resources[player * 6 + CARD_STOCK_OFFSETS[card]] >= CARD_COSTS[card]
+
+    def get_playable_mask(self, player: int) -> int:
+        """Bitmask of the card indices the player can afford (bit i for card i)."""
+        resources = self.resources
+        mask_stocks = self.mask_stocks
+        resource_masks = self.resource_masks
+        mask = 0
+        for resource_type in range(3):
+            key = player * 3 + resource_type
+            stock = resources[player * 6 + resource_type * 2 + 1]
+            if mask_stocks[key] != stock:
+                mask_stocks[key] = stock
+                resource_masks[key] = MOVE_GENERATOR.resource_mask(resource_type, stock)
+            mask |= resource_masks[key]
+        return mask
+
+    def get_possible_moves(self) -> list[int]:
+        """Same moves as Game.get_possible_moves: playable hand cards first, then every hand card discarded."""
+        hand = self.get_hand(self.current)
+        mask = self.get_playable_mask(self.current)
+        possible_moves = [card * 2 for card in hand if mask >> card & 1]
+        possible_moves.extend(card * 2 + 1 for card in hand)
+        return possible_moves
+
+    # === Gameplay ===
+
+    def apply_move(self, card: int, discarded: bool, from_hand: bool = True) -> None:
+        """
+        Applies a move following Game.apply_move.
+
+        With from_hand=False the card is played without touching the hand: nothing is
+        discarded or drawn, which is how search models the opponent's hidden hand.
+        """
+        player = self.current
+        if not discarded:
+            self.use_card_effect(player, card)
+            idx = player * 6 + CARD_STOCK_OFFSETS[card]
+            self._set_resource(idx, self.resources[idx] - CARD_COSTS[card])
+
+        if from_hand:
+            self.discard_card(player, card)
+
+        self.update_resources(1 - player)
+        self.set_game_status()
+
+        if self.status == 0:
+            if from_hand:
+                self.draw_card(player)
+            self.current = 1 - player
+            self.hash ^= SIDE_TO_MOVE_KEY
+            self.turn += 1
+
+    def apply_move_code(self, move: int, from_hand: bool = True) -> None:
+        card, discarded = decode_move(move)
+        self.apply_move(card, discarded, from_hand)
+
+    def update_resources(self, player: int) -> None:
+        resources = self.resources
+        for idx in range(player * 6, player * 6 + 6, 2):
+            self._set_resource(idx + 1, resources[idx + 1] + resources[idx])
+
+    def discard_card(self, player: int, card: int) -> None:
+        base = player * HAND_SIZE
+        for slot in range(HAND_SIZE):
+            if self.hands[base + slot] == card:
+                self._set_hand_slot(player, slot, EMPTY_SLOT)
+                return
+        raise ValueError('Card not found in hand')
+
+    def draw_card(self, player: int) -> None:
+        base = player * HAND_SIZE
+        for slot in range(HAND_SIZE):
+            if self.hands[base + slot] == EMPTY_SLOT:
+                if self.deck_sizes[player] == 0:
+                    # If deck runs out of cards, refill it from the deck template
+                    deck_cards = list(self.deck_templates[player])
+                    shuffle(deck_cards)
+                    self.decks[player] = tuple(deck_cards)
+                    self.deck_sizes[player] = len(deck_cards)
+                self.deck_sizes[player] -= 1
+                self._set_hand_slot(player, slot, self.decks[player][self.deck_sizes[player]])
+                return
+
+    def has_empty_hand(self, player: int) -> bool:
+        base = player * HAND_SIZE
+        return all(card == EMPTY_SLOT for card in self.hands[base:base + HAND_SIZE])
+
+    def use_card_effect(self, player: int, card: int) -> None:
+        for opcode, target, value in CARD_ACTIONS[card]:
+            target_player = 1 - player if target == TARGET_ENEMY else player
+            self.apply_action_to_player(target_player, opcode, value)
+
+    def apply_action_to_player(self, player: int, opcode: int, value: int) -> None:
+        resources = self.resources
+        base = player * 6
+        if opcode == OP_DAMAGE:
+            self.receive_damage(player, value)
+        elif opcode == OP_CASTLE:
+            self._set_castle(player, max(0, self.castle[player] + value))
+        elif opcode == OP_FENCE:
+            self._set_fence(player, max(0, self.fence[player] + value))
+        elif opcode == OP_STACKS:
+            for idx in range(base + 1, base + 6, 2):
+                self._set_resource(idx, max(0, resources[idx] + value))
+        elif opcode == OP_ALL:
+            self._set_castle(player, max(0, self.castle[player] + value))
+            self._set_fence(player, max(0, self.fence[player] + value))
+            for idx in range(base, base + 6):
+                self._set_resource(idx, max(1, resources[idx] + value))
+        elif opcode == OP_TRANSFER:
+            self.transfer_resources(player, 1 - player, value)
+        else:
+            idx = base + opcode - OP_RESOURCE
+            self._set_resource(idx, max(0, resources[idx] + value))
+
+    def receive_damage(self, player: int, incoming_damage: int) -> None:
+        fence_damage = min(self.fence[player], incoming_damage)
+        self._set_fence(player, max(0, self.fence[player] - fence_damage))
+        self._set_castle(player, max(0, self.castle[player] - (incoming_damage - fence_damage)))
+
+    def transfer_resources(self, source: int, destination: int, transfer_amount: int) -> None:
+        resources = self.resources
+        for resource_type in range(len(resource_names)):
+            source_idx = source * 6 + resource_type * 2 + 1
+            destination_idx = destination * 6 + resource_type * 2 + 1
+            actual_amount = min(resources[source_idx], transfer_amount)
+            self._set_resource(source_idx, resources[source_idx] - actual_amount)
+            self._set_resource(destination_idx, resources[destination_idx] + actual_amount)
+
+    def set_game_status(self) -> None:
+        castle1, castle2 = self.castle
+        # Draw conditions
+        if castle1 <= 0 and castle2 <= 0:
+            self.status = -1
+        elif castle1 >= 100 and castle2 >= 100:
+            self.status = -1
+        # Individual player win conditions
+        elif castle1 >= 100:
+            self.status = 1
+        elif castle2 >= 100:
+            self.status = 2
+        elif castle1 <= 0:
+            self.status = 2
+        elif castle2 <= 0:
+            self.status = 1
+        # Card related win conditions
+        elif self.has_empty_hand(0) and self.has_empty_hand(1):
+            self.status = -1
+        else:
+            self.status = 0
@@ -1,37 +1,106 @@
 import random
 import math
-from typing import Optional, Tuple, Union
+import multiprocessing
+import threading
+import time
+import itertools
+from contextlib import nullcontext
+from typing import Callable, Optional, Tuple, Union
 from pathlib import Path
 from models.AIPlayer import AIPlayer
 from models.Card import Card
-from Game import Game
+from models.GameState import GameState, MOVE_GENERATOR
+from models.MoveGenerator import encode_move, decode_move
+from models.RolloutKernel import RolloutKernel
+from models.TranspositionTable import TranspositionTable, TranspositionNode
+from models.TreeStore import TreeStore
+from DeckManager import DeckManager
+
+PASS_MOVE = encode_move(0, True)  # The opponent's hand is unknown, so all of its discards are searched as one move
+VIRTUAL_LOSS = 3.0  # Temporary loss (the value of a lost game in MCTSAIPlayer.evaluate) put on nodes being searched by a thread
+LOCK_STRIPES = 64
+BUDGET_CHECK_INTERVAL = 16  # Iterations between checks of the node budget and early stopping
+PROGRESS_INTERVAL = 0.1  # Seconds between progress reports
+
+def get_search_moves(game_state: GameState, is_agent_turn: bool) -> list[int]:
+    """Moves considered by the search: the agent plays from its hand, the opponent any affordable card or a single pass."""
+    if is_agent_turn:
+        return game_state.get_possible_moves()
+    return MOVE_GENERATOR.play_moves(game_state.get_playable_mask(game_state.current)) + [PASS_MOVE]
+
+# Player instance owned by each root-parallel worker process, see MCTSAIPlayer.search_parallel
+_worker_player: Optional['MCTSAIPlayer'] = None
+
+def _init_search_worker(player_type: type, player_kwargs: dict) -> None:
+    global _worker_player
+    _worker_player = player_type(**player_kwargs)
+
+def _run_search_worker(task: Tuple[GameState, int, int, Optional[float]]) -> list[Tuple[int, float, int]]:
+    root_state, iterations, seed, time_limit = task
+    assert _worker_player is not None
+    random.seed(seed)
+    _worker_player.iterations = iterations
+    _worker_player.start_budget(time_limit)
+    return _worker_player.search(root_state)
 
 class Node:
-    def __init__(self, game_state: dict, parent: Optional["Node"] = None, move: Optional[Tuple] = None, is_agent_turn_next: bool = True):
-        self.game_state = game_state
+    """
+    Search tree node.
+
+    Only expanded nodes keep their game state. A leaf drops it once its simulation is
+    backpropagated (see release_state) and rebuilds it from its parent's state and its move
+    when needed again, so a leaf costs little more than its statistics.
+    """
+    __slots__ = ('_game_state', 'status', 'parent', 'move', 'children', 'visits', 'score', 'is_agent_turn_next', 'untried_moves')
+
+    def __init__(self, game_state: GameState, parent: Optional["Node"] = None, move: Optional[int] = None, is_agent_turn_next: bool = True):
+        self._game_state: Optional[GameState] = game_state
+        self.status = game_state.status
         self.parent = parent
         self.move = move
         self.children = []
         self.visits = 0
         self.score = 0
         self.is_agent_turn_next = is_agent_turn_next
+        # Moves without a child yet, last to be expanded first. Generated once, when first needed
+        self.untried_moves: Optional[list[int]] = None
+
+    @property
+    def game_state(self) -> GameState:
+        game_state = self._game_state
+        if game_state is None:
+            assert self.parent is not None and self.move is not None
+            game_state = self.parent.game_state.copy()
+            game_state.apply_move_code(self.move, from_hand=self.parent.is_agent_turn_next)
+        return game_state
+
+    @game_state.setter
+    def game_state(self, game_state: GameState) -> None:
+        self._game_state = game_state
+        self.status = game_state.status
+
+    def release_state(self) -> None:
+        """Drops the state of a leaf, it is rebuilt from the parent when needed."""
+        parent = self.parent
+        if parent is None or self.untried_moves is not None:
+            return
+        # A draw from an empty deck reshuffles it, such a state could not be rebuilt the same way
+        parent_state = parent._game_state
+        if parent.is_agent_turn_next and parent_state.deck_sizes[parent_state.current] == 0:
+            return
+        self._game_state = None
 
     def is_terminal(self) -> bool:
         """Check if the game state is terminal (game over)."""
-        return self.game_state["game_status"] in [1, 2, -1]
+        return self.status in (1, 2, -1)
 
     def is_fully_expanded(self) -> bool:
         """Check if all possible moves have been explored."""
-        game = Game.from_state(self.game_state)
-        current_player = game.current_player
-        assert current_player is not None
-
-        if self.is_agent_turn_next:
-            moves = game.get_possible_moves()  # For the current player
-        else:
-            moves = [move for move in game.get_legal_moves() if not move[1]] + [[move for move in game.get_legal_moves() if move[1]][0]]  # For the opponent
-
-        return len(self.children) == len(moves)
+        if self.untried_moves is None:
+            # Expanded nodes keep their state, children are built from it
+            self._game_state = self.game_state
+            self.untried_moves = get_search_moves(self._game_state, self.is_agent_turn_next)[::-1]
+        return not self.untried_moves
 
     def ucb1_value(self, exploration_weight: float = 1) -> float:
         """Calculate the UCB1 value of this node."""
@@ -43,59 +112,702 @@ class Node:
 
         return (self.score / self.visits) + exploration_weight * math.sqrt(math.log(parent_visits) / self.visits)
 
-    def best_child(self) -> 'Node':
-        """Return the child node with the highest UCB1 value."""
+    def best_child(self, exploration_weight: float = 1) -> 'Node':
+        """Return the child node with the highest UCB1 value, the first unvisited one if there is any."""
         if not self.children:
             raise ValueError('Root node has no children')
 
+        # Same values as ucb1_value, with the parent's log visits computed once
+        log_visits = math.log(self.visits) if self.visits > 0 else 0.0
+        sqrt = math.sqrt
         best_value = -float('inf')
         for child in self.children:
-            ucb1_val = child.ucb1_value()
+            visits = child.visits
+            if visits == 0:
+                return child
+            ucb1_val = child.score / visits + exploration_weight * sqrt(log_visits / visits)
             if ucb1_val > best_value:
                 best_value = ucb1_val
                 best_node = child
-        
+
         return best_node
 
-    def add_child(self, move: Tuple, game_state: dict) -> None:
+    def children_stats(self) -> list[Tuple[int, float, int]]:
+        """(move, score, visits) of every child."""
+        return [(child.move, child.score, child.visits) for child in self.children]
+
+    def add_child(self, move: int, game_state: GameState) -> 'Node':
         """Add a child node."""
         new_state = game_state
         child_node = Node(new_state, parent=self, move=move, is_agent_turn_next=not self.is_agent_turn_next)
         self.children.append(child_node)
+        return child_node
 
     def update(self, result: float) -> None:
         """Update the node's visit count and win count based on the result."""
         self.visits += 1
         self.score += result
 
+class InformationSetNode:
+    """
+    Node of the information set search, reached by a sequence of moves rather than a single state.
+
+    Children are keyed by move. A child is only selectable in the determinizations where its
+    move is possible, so UCB1 uses the number of times it was available instead of parent visits.
+    """
+    __slots__ = ('parent', 'move', 'children', 'visits', 'score', 'availability')
+
+    def __init__(self, parent: Optional['InformationSetNode'] = None, move: Optional[int] = None) -> None:
+        self.parent = parent
+        self.move = move
+        self.children: dict[int, InformationSetNode] = {}
+        self.visits = 0
+        self.score = 0.0
+        self.availability = 0
+
+    def ucb1_value(self, exploration_weight: float = 1) -> float:
+        return (self.score / self.visits) + exploration_weight * math.sqrt(math.log(self.availability) / self.visits)
+
+    def children_stats(self) -> list[Tuple[int, float, int]]:
+        return [(move, child.score, child.visits) for move, child in self.children.items()]
+
+    def add_child(self, move: int) -> 'InformationSetNode':
+        child = InformationSetNode(parent=self, move=move)
+        self.children[move] = child
+        return child
+
+    def update(self, result: float) -> None:
+        self.visits += 1
+        self.score += result
+
 class MCTSAIPlayer(AIPlayer):
-    def __init__(self, id: int, name: str, preferred_deck_file: Union[str, Path] = 'default_deck.json', depth_limit: int = 200, iterations: int = 3000):
+    def __init__(
+        self, id: int, name: str, preferred_deck_file: Union[str, Path] = 'default_deck.json', depth_limit: int = 200, iterations: int = 3000,
+        transpositions: bool = False, table_size: int = 20000, workers: int = 1, threads: int = 1, reuse_tree: bool = True,
+        determinize: bool = False, compact_tree: bool = False, exploration_weight: float = 1,
+        time_limit: Optional[float] = None, node_limit: Optional[int] = None, early_stop: bool = False,
+        ponder: bool = False
+    ):
         super().__init__(id, name, preferred_deck_file)
         self.depth_limit = depth_limit
         self.iterations = iterations
 
-    def take_turn(self, game_state: dict) -> Tuple[Optional[object], bool]:
-        """Executes the MCTS logic to determine the best move."""
-        best_move = self.mcts(game_state)
+        # Exploration constant of UCB1, larger values spread the iterations over more moves
+        if exploration_weight < 0:
+            raise ValueError('Exploration weight cannot be negative')
+        self.exploration_weight = exploration_weight
+
+        # With transpositions enabled, positions reached by different move orders share one node (DAG search)
+        self.transposition_table = TranspositionTable(table_size) if transpositions else None
+        self.table_size = table_size
+
+        # With several workers, independent searches run in a process pool that is reused across moves
+        self.workers = workers
+        self._pool = None
+
+        # With several threads, the tree search runs on one shared tree using virtual loss
+        if threads > 1 and transpositions:
+            raise ValueError('Tree-parallel search is not supported together with transpositions')
+        self.threads = threads
+
+        # With determinization, every iteration samples the opponent's hand and both deck orders (ISMCTS)
+        if determinize and (transpositions or threads > 1):
+            raise ValueError('Determinized search is not supported together with transpositions or threads')
+        self.determinize = determinize
+
+        # With tree reuse, the subtree reached by the last move and the opponent's reply seeds the next search
+        self.reuse_tree = reuse_tree
+        self._tree_root: Optional[Node] = None
+        self._last_move: Optional[int] = None
+
+        self._rollout_kernels = threading.local()
+
+        # With a compact tree, the search runs on a TreeStore of flat arrays instead of Node objects (not kept between moves)
+        if compact_tree and (transpositions or determinize or threads > 1):
+            raise ValueError('Compact tree search is not supported together with transpositions, determinization or threads')
+        self.compact_tree = compact_tree
+
+        # Budgets ending a search before all iterations ran: seconds per move, new nodes per move,
+        # and with early stopping, once the most visited root child can no longer be overtaken
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.early_stop = early_stop
+        self._search_start = 0.0
+        self._deadline: Optional[float] = None
+        self._node_count = 0
+        self._next_budget_check = BUDGET_CHECK_INTERVAL
+
+        # Searches can be cancelled from another thread and report (iterations, root stats) while running
+        self._cancel_event = threading.Event()
+        self.progress_callback: Optional[Callable[[int, list[Tuple[int, float, int]]], None]] = None
+        self._next_progress_report = 0.0
+
+        # With pondering, the kept tree is searched on a background thread during the opponent's turn
+        self.ponder = ponder
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop = threading.Event()
+
+    def take_turn(self, game_state: dict, time_limit: Optional[float] = None) -> Tuple[Optional[object], bool]:
+        """Executes the MCTS logic to determine the best move, within time_limit seconds if given."""
+        best_move = self.mcts(game_state, time_limit)
         return best_move
     
-    def mcts(self, game_state: dict) -> Tuple[Optional[object], bool]:
-        # Root node creation
-        root = Node(game_state, parent=None, move=None)
+    def mcts(self, game_state: dict, time_limit: Optional[float] = None) -> Tuple[Optional[object], bool]:
+        self.stop_pondering()
+        root_state = GameState.from_state(game_state)
+        self.start_budget(time_limit)
+        if self.workers > 1 and not multiprocessing.current_process().daemon:
+            root_stats = self.search_parallel(root_state)
+        else:
+            root_stats = self.search(root_state)
+        if not root_stats:
+            # Cancelled before the first iteration, the first move the search would have tried is played
+            root_stats = [(get_search_moves(root_state, True)[0], 0.0, 0)]
+
+        best_move, best_score, best_visits = self.best_root_stat(root_stats)
+
+        self._last_move = best_move
+        card_index, discarded = decode_move(best_move)
+        card = DeckManager.load_all_cards()[card_index]
+        print(card.name, discarded, best_score, best_visits)
+        return card, discarded
+
+    def best_root_stat(self, root_stats: list[Tuple[int, float, int]]) -> Tuple[int, float, int]:
+        """
+        The (move, score, visits) of the root child to play: the best mean score, ties broken on
+        visits. When a time or node budget or early stopping can end the search sooner, the most
+        visited child is played instead, since early stopping only ensures it can't be overtaken.
+        """
+        if self._deadline is not None or self.node_limit is not None or self.early_stop:
+            return max(root_stats, key=lambda stat: (stat[2], stat[1] / stat[2] if stat[2] > 0 else float('-inf')))
+        return max(root_stats, key=lambda stat: (stat[1] / stat[2] if stat[2] > 0 else float('-inf'), stat[2]))
+
+    def start_budget(self, time_limit: Optional[float] = None) -> None:
+        """Starts the budgets of one decision. time_limit overrides self.time_limit for it."""
+        time_limit = self.time_limit if time_limit is None else time_limit
+        self._search_start = time.perf_counter()
+        self._deadline = self._search_start + time_limit if time_limit is not None else None
+        self._node_count = 0
+        self._next_budget_check = BUDGET_CHECK_INTERVAL
+        self._next_progress_report = self._search_start + PROGRESS_INTERVAL
+
+    def cancel(self) -> None:
+        """
+        Stops the running search, which returns the best move found so far, and every later one
+        until reset_cancel is called. Safe to call from any thread.
+        """
+        self._cancel_event.set()
+
+    def reset_cancel(self) -> None:
+        """Lets searches run again after cancel, call it when a new turn is requested."""
+        self._cancel_event.clear()
+
+    def is_budget_exhausted(self, completed: int, root_stats: Callable[[], list[Tuple[int, float, int]]]) -> bool:
+        """
+        Tells whether the search should stop after completed iterations, reporting progress on the way.
+
+        The iteration count, cancellation and time are checked every time, the node budget and
+        early stopping every BUDGET_CHECK_INTERVAL iterations. Early stopping compares the visit
+        lead of the most visited root child with the iterations left, estimated from the search
+        speed when a time limit is set. Unless the search is cancelled, the first iteration always
+        runs, so the root has a child.
+        """
+        if completed >= self.iterations or self._cancel_event.is_set():
+            return True
+        if completed == 0:
+            return False
+        now = time.perf_counter()
+        if self._deadline is not None and now >= self._deadline:
+            return True
+        if completed < self._next_budget_check:
+            return False
+        self._next_budget_check = completed + BUDGET_CHECK_INTERVAL
+
+        if self.node_limit is not None and self._node_count >= self.node_limit:
+            return True
+
+        if self.progress_callback is not None and now >= self._next_progress_report:
+            self._next_progress_report = now + PROGRESS_INTERVAL
+            self.progress_callback(completed, root_stats())
+
+        if self.early_stop:
+            remaining = self.iterations - completed
+            if self._deadline is not None:
+                speed = completed / max(now - self._search_start, 1e-9)
+                remaining = min(remaining, int(speed * (self._deadline - now)) + 1)
+            visits = sorted((visits for _, _, visits in root_stats()), reverse=True)
+            if len(visits) == 1 or (len(visits) > 1 and visits[0] - visits[1] > remaining):
+                return True
+        return False
+
+    def search(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """Runs one search from the root state and returns (move, score, visits) of the root children."""
+        if self.transposition_table is not None:
+            return self.search_transpositions(root_state)
+        if self.determinize:
+            return self.search_information_sets(root_state)
+        if self.compact_tree:
+            return self.search_compact(root_state)
+        return self.search_tree(root_state)
+
+    def search_parallel(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """
+        Root-parallel search: each worker runs an independent search with its own seed and
+        an equal share of the iterations, then the root children statistics are summed.
+        """
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                processes=self.workers,
+                initializer=_init_search_worker,
+                initargs=(type(self), self.get_worker_kwargs())
+            )
+
+        worker_iterations = max(1, -(-self.iterations // self.workers))
+        time_limit = max(0.0, self._deadline - time.perf_counter()) if self._deadline is not None else None
+        tasks = [(root_state, worker_iterations, random.getrandbits(32), time_limit) for _ in range(self.workers)]
+
+        merged_stats = {}
+        for worker_stats in self._pool.map(_run_search_worker, tasks):
+            for move, score, visits in worker_stats:
+                total_score, total_visits = merged_stats.get(move, (0, 0))
+                merged_stats[move] = (total_score + score, total_visits + visits)
+
+        return [(move, score, visits) for move, (score, visits) in merged_stats.items()]
+
+    def get_worker_kwargs(self) -> dict:
+        """Constructor arguments for the copy of this player living in each worker process."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'preferred_deck_file': self.preferred_deck_file,
+            'depth_limit': self.depth_limit,
+            'iterations': self.iterations,
+            'transpositions': self.transposition_table is not None,
+            'table_size': self.table_size,
+            'threads': self.threads,
+            'reuse_tree': False,  # A kept tree would count its visits again in every merge
+            'determinize': self.determinize,
+            'compact_tree': self.compact_tree,
+            'exploration_weight': self.exploration_weight,
+            'node_limit': self.node_limit // self.workers if self.node_limit is not None else None,
+            'early_stop': self.early_stop,
+        }
+
+    def close(self) -> None:
+        """Stops pondering, shuts down the worker pool of the root-parallel search and drops the kept tree."""
+        self.stop_pondering()
+        self._tree_root = None
+        self._last_move = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def search_tree(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """Runs the iterations on the kept or a fresh tree and returns (move, score, visits) of the root children."""
+        root = self.reuse_root(root_state) if self.keeps_tree() else None
+        if root is None:
+            root = Node(root_state, parent=None, move=None)
+        self.run_iterations(root)
+        self._tree_root = root if self.keeps_tree() else None
+
+        # self.display_tree(root)
+        return root.children_stats()
+
+    def reuse_root(self, root_state: GameState) -> Optional[Node]:
+        """
+        Returns the node of the kept tree matching the root state, detached from its parent so the
+        rest of the old tree is freed.
+
+        When the applied moves were observed (see observe_move), the kept root already follows
+        them. Otherwise the node is searched below the last chosen move, recognizing the
+        opponent's reply by the position it leads to. Returns None when no node matches.
+        """
+        old_root, last_move = self._tree_root, self._last_move
+        self._tree_root = None
+        if old_root is None:
+            return None
+
+        if last_move is None:
+            candidates = [old_root]
+        else:
+            played = next((child for child in old_root.children if child.move == last_move), None)
+            if played is None:
+                return None
+            candidates = played.children
+
+        matches = [node for node in candidates if self.is_same_position(node.game_state, root_state)]
+        if not matches:
+            return None
+        return self._detach_root(max(matches, key=lambda node: node.visits), root_state)
+
+    def _detach_root(self, node: Node, game_state: GameState) -> Node:
+        node.parent = None
+        node.move = None
+        self._rebase_tree(node, game_state)
+        return node
+
+    def _rebase_tree(self, root: Node, game_state: GameState) -> None:
+        """
+        Replays the tree below root from game_state. The tree holds the cards drawn by the search,
+        so children whose move is no longer possible with the real hand are dropped, and the
+        moves it newly allows become untried.
+        """
+        stack = [(root, game_state)]
+        while stack:
+            node, state = stack.pop()
+            node.game_state = state
+            if node.untried_moves is None:
+                node.release_state()
+                continue
+
+            remaining_moves = get_search_moves(state, node.is_agent_turn_next)
+            children = []
+            for child in node.children:
+                if child.move in remaining_moves:
+                    remaining_moves.remove(child.move)
+                    children.append(child)
+            node.children = children
+            node.untried_moves = remaining_moves[::-1]
+
+            for child in children:
+                child_state = state.copy()
+                child_state.apply_move_code(child.move, from_hand=node.is_agent_turn_next)
+                stack.append((child, child_state))
+
+    def observe_move(self, player_id: int, card: Card, discarded: bool, game_state: dict) -> None:
+        """
+        Follows a move applied to the game (game_state is the position after it) with the kept
+        tree, so the next search starts from the matching node with its visits, then ponders
+        on the new position if the opponent is to move.
+        """
+        self.stop_pondering()
+        if not self.keeps_tree():
+            return
+        if game_state['game_status'] != 0:
+            self._tree_root = None
+            return
+
+        state = GameState.from_state(game_state)
+        card_index = DeckManager.get_card_index(card.id)
+        if player_id == self.id:
+            move = encode_move(card_index, discarded)
+        else:
+            move = PASS_MOVE if discarded else encode_move(card_index, False)
+
+        root = self._tree_root
+        child = None
+        if root is not None:
+            child = next((node for node in root.children if node.move == move and self.is_same_position(node.game_state, state)), None)
+        if child is not None:
+            self._tree_root = self._detach_root(child, state)
+        else:
+            self._tree_root = Node(state, is_agent_turn_next=self.is_current_player(state.current_player_id))
+        self._last_move = None
+
+        if self.ponder and not self.is_current_player(state.current_player_id):
+            self.start_pondering()
 
-        for _ in range(self.iterations):
+    def observes_moves(self) -> bool:
+        return self.keeps_tree()
+
+    def keeps_tree(self) -> bool:
+        """Whether the tree of the plain tree search is kept between moves."""
+        return (
+            self.reuse_tree and self.transposition_table is None and not self.determinize
+            and not self.compact_tree and self.workers == 1
+        )
+
+    def start_pondering(self) -> None:
+        """Searches the kept tree on a background thread until stop_pondering or self.iterations iterations."""
+        root = self._tree_root
+        if root is None or root.is_terminal():
+            return
+
+        def ponder_tree() -> None:
+            completed = 0
+            while completed < self.iterations and not self._ponder_stop.is_set():
+                node = self.select_node(root)
+                simulation_result = self.simulate(node, self.depth_limit)
+                self.backpropagate(node, simulation_result)
+                completed += 1
+
+        self._ponder_stop.clear()
+        self._ponder_thread = threading.Thread(target=ponder_tree, daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self) -> None:
+        if self._ponder_thread is not None:
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+
+    def is_same_position(self, game_state: GameState, other: GameState) -> bool:
+        """Compares the public parts of two positions. The hands and decks are left out, see _rebase_tree."""
+        return (
+            game_state.current == other.current
+            and game_state.status == other.status
+            and game_state.castle == other.castle
+            and game_state.fence == other.fence
+            and game_state.resources == other.resources
+        )
+
+    def run_iterations(self, root: Node) -> None:
+        """Runs the search iterations on the tree below root."""
+        if self.threads > 1:
+            self.search_tree_threaded(root)
+            return
+
+        completed = 0
+        while not self.is_budget_exhausted(completed, root.children_stats):
             node = self.select_node(root)
             simulation_result = self.simulate(node, self.depth_limit)
             self.backpropagate(node, simulation_result)
+            completed += 1
 
-        best_child = max(
-            root.children,
-            key=lambda child: (child.score / child.visits if child.visits > 0 else float('-inf'), child.visits)
-        )
-        
-        # self.display_tree(root)
-        print(best_child.move[0].name, best_child.move[1], best_child.score, best_child.visits)
-        return best_child.move if best_child else (None, False)
+    def search_tree_threaded(self, root: Node) -> None:
+        """
+        Tree-parallel search: threads share the tree and take iterations from a common counter.
+
+        Nodes on a path being searched carry a virtual loss so other threads prefer different
+        leaves. Node updates are guarded by a fixed set of locks picked by node identity.
+        """
+        locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+        iteration_counter = itertools.count()
+
+        def run_iterations() -> None:
+            while not self.is_budget_exhausted(next(iteration_counter), root.children_stats):
+                node = self.select_node_parallel(root, locks)
+                simulation_result = self.simulate(node, self.depth_limit)
+                self.backpropagate_parallel(node, simulation_result, locks)
+
+        threads = [threading.Thread(target=run_iterations) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _get_node_lock(self, node: Node, locks: Optional[list[threading.Lock]]):
+        if locks is None:
+            return nullcontext()
+        return locks[(id(node) >> 4) % len(locks)]
+
+    def select_node_parallel(self, root_node: Node, locks: Optional[list[threading.Lock]] = None) -> Node:
+        """
+        Same descent as select_node, adding a virtual loss to every node on the path.
+
+        Without locks, it is used to pick several pending leaves in a single thread.
+        """
+        current_node = root_node
+        with self._get_node_lock(current_node, locks):
+            current_node.visits += 1
+            current_node.score -= VIRTUAL_LOSS
+
+        while True:
+            with self._get_node_lock(current_node, locks):
+                if current_node.is_terminal():
+                    return current_node
+                if not current_node.is_fully_expanded():
+                    best_child = self.expand(current_node)
+                else:
+                    # Select the best child using UCB1
+                    best_child = current_node.best_child(self.exploration_weight)
+
+            with self._get_node_lock(best_child, locks):
+                was_unvisited = best_child.visits == 0
+                best_child.visits += 1
+                best_child.score -= VIRTUAL_LOSS
+
+            if was_unvisited:
+                return best_child
+
+            current_node = best_child
+
+    def backpropagate_parallel(self, node: Node, result: float, locks: Optional[list[threading.Lock]] = None) -> None:
+        """Replaces the virtual loss with the simulation result; visits were already counted during selection."""
+        # Under the node lock, so another thread can't be expanding the node meanwhile (see is_fully_expanded)
+        with self._get_node_lock(node, locks):
+            node.release_state()
+        while node is not None:
+            with self._get_node_lock(node, locks):
+                node.score += result + VIRTUAL_LOSS
+            node = node.parent
+
+    def search_information_sets(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """
+        Information set search: each iteration plays on a new determinization of the root state,
+        in which both players play from their hands under the normal rules. Statistics of the same
+        move sequence are shared across determinizations.
+        """
+        root = InformationSetNode()
+        observer = root_state.current
+
+        completed = 0
+        while not self.is_budget_exhausted(completed, root.children_stats):
+            game_state = root_state.determinize(observer)
+            node = root
+
+            while game_state.status == 0:
+                moves = game_state.get_possible_moves()
+                untried = [move for move in moves if move not in node.children]
+                if untried:
+                    move = random.choice(untried)
+                    game_state.apply_move_code(move)
+                    node = node.add_child(move)
+                    self._node_count += 1
+                    break
+
+                best_value = -float('inf')
+                for move in set(moves):
+                    child = node.children[move]
+                    child.availability += 1
+                    ucb1_val = child.ucb1_value(self.exploration_weight)
+                    if ucb1_val > best_value:
+                        best_value = ucb1_val
+                        best_node = child
+                node = best_node
+                game_state.apply_move_code(node.move)
+
+            simulation_result = self.simulate(Node(game_state, move=node.move), self.depth_limit)
+            while node is not None:
+                node.update(simulation_result)
+                node = node.parent
+            completed += 1
+
+        return root.children_stats()
+
+    def search_compact(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """
+        Same search as search_tree on a TreeStore, which takes a few dozen bytes per node
+        instead of a Node object, for long searches. Leaf states are built by replaying moves,
+        so iterations are somewhat slower.
+        """
+        tree = TreeStore(root_state)
+        get_root_stats = tree.children_stats
+
+        completed = 0
+        while not self.is_budget_exhausted(completed, get_root_stats):
+            node = 0
+            parent_state = None  # Known when the leaf's parent was just expanded
+            while tree.status[node] == 0:
+                if not tree.is_expanded(node):
+                    parent_state = tree.get_state(node)
+                    tree.expand(node, get_search_moves(parent_state, bool(tree.agent_turn[node])))
+                if tree.child_count[node] == 0:
+                    parent_state = None
+                    break
+                node = tree.select_child(node, self.exploration_weight)
+                if tree.visits[node] == 0:
+                    self._node_count += 1
+                    break
+                parent_state = None
+
+            # The status of a leaf is known once its state was built, terminal leaves are not rebuilt again
+            if tree.status[node] != 0:
+                simulation_result = self.evaluate(int(tree.status[node]))
+            else:
+                game_state = tree.get_child_state(node, parent_state) if parent_state is not None else tree.get_state(node)
+                simulation_result = self.simulate(Node(game_state, move=int(tree.move[node])), self.depth_limit)
+            tree.backpropagate(node, simulation_result)
+            completed += 1
+
+        return get_root_stats()
+
+    def search_transpositions(self, root_state: GameState) -> list[Tuple[int, float, int]]:
+        """
+        Runs the iterations on the transposition table and returns (move, score, visits) of the root children.
+
+        Statistics live on the shared nodes, so every parent of a position sees all visits made
+        through any path. The table is kept between moves; evicted positions are rebuilt from
+        their parent when selected again.
+        """
+        table = self.transposition_table
+        assert table is not None
+
+        root = self._get_transposition_node(root_state)
+
+        def get_root_stats() -> list[Tuple[int, float, int]]:
+            root_stats = []
+            for move, key in zip(root.moves, root.child_keys):
+                child = table.peek(key) if key is not None else None
+                root_stats.append((move, child.score, child.visits) if child is not None else (move, 0, 0))
+            return root_stats
+
+        completed = 0
+        while not self.is_budget_exhausted(completed, get_root_stats):
+            path, move = self.select_path(root)
+            # Leaves are simulated through the move of this path, the value network depends on it
+            simulation_result = self.simulate(Node(path[-1].game_state, move=move), self.depth_limit)
+            for node in path:
+                node.update(simulation_result)
+            completed += 1
+
+        return get_root_stats()
+
+    def _get_transposition_node(self, game_state: GameState) -> TranspositionNode:
+        """Returns the table node of the position, creating it if it is not stored."""
+        table = self.transposition_table
+        assert table is not None
+
+        node = table.get(game_state.hash)
+        if node is None:
+            is_agent_turn = self.is_current_player(game_state.current_player_id)
+            moves = get_search_moves(game_state, is_agent_turn) if game_state.status == 0 else []
+            node = TranspositionNode(game_state, moves, is_agent_turn)
+            table.put(game_state.hash, node)
+            self._node_count += 1
+        return node
+
+    def select_path(self, root: TranspositionNode) -> Tuple[list[TranspositionNode], Optional[int]]:
+        """
+        Descends from the root with UCB1 until an unvisited or terminal position. Returns the path
+        and the move leading to its last node (None if it is the root).
+        """
+        path = [root]
+        node = root
+        last_move = None
+
+        while not node.is_terminal():
+            move, child = self._select_transposition_child(node, self.exploration_weight)
+            if any(child is visited for visited in path):
+                break  # Reached a position already on the path
+            path.append(child)
+            last_move = move
+            if child.visits == 0:
+                break
+            node = child
+
+        return path, last_move
+
+    def _select_transposition_child(self, node: TranspositionNode, exploration_weight: float = 1) -> Tuple[int, TranspositionNode]:
+        table = self.transposition_table
+        assert table is not None
+
+        best_value = -float('inf')
+        best_index = 0
+        best_child = None
+        log_visits = math.log(node.visits) if node.visits > 0 else 0.0
+
+        for idx, key in enumerate(node.child_keys):
+            child = table.peek(key) if key is not None else None
+            if child is None or child.visits == 0:
+                # Unexplored (or evicted) positions are tried first
+                best_index, best_child = idx, None
+                break
+            value = (child.score / child.visits) + exploration_weight * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value, best_index, best_child = value, idx, child
+
+        move = node.moves[best_index]
+        if best_child is not None:
+            table.get(node.child_keys[best_index])  # Mark as recently used
+            return move, best_child
+
+        child_state = node.game_state.copy()
+        self._apply_move(child_state, move)
+        node.child_keys[best_index] = child_state.hash
+        return move, self._get_transposition_node(child_state)
 
     def select_node(self, root_node: Node) -> 'Node':
         current_node = root_node
@@ -104,84 +816,52 @@ class MCTSAIPlayer(AIPlayer):
             if current_node.is_terminal():
                 return current_node
             if not current_node.is_fully_expanded():
-                self.expand(current_node)
+                return self.expand(current_node)
             
             # Select the best child using UCB1
-            best_child = current_node.best_child()
+            best_child = current_node.best_child(self.exploration_weight)
 
             if best_child.visits == 0:
                 return best_child
 
             current_node = best_child
 
-    def expand(self, node: Node) -> None:
-        """Expand a node by adding a child for an unexplored move."""
-        game = Game.from_state(node.game_state)
-        current_player = game.current_player
-
-        assert current_player is not None
-        if self.is_current_player(current_player.id):
-            moves = game.get_possible_moves()  # For the current player
-        else:
-            moves = [move for move in game.get_legal_moves() if not move[1]] + [[move for move in game.get_legal_moves() if move[1]][0]]  # For the opponent
-        
-        for move in moves:
-            temp_game = Game.from_state(node.game_state)
-            self._apply_move(temp_game, move)
-            child_state = temp_game.to_state()
-            node.add_child(move, child_state)
+    def expand(self, node: Node) -> Node:
+        """Expand a node by adding and returning the child of its next untried move."""
+        assert node.untried_moves
+        move = node.untried_moves.pop()
+        child_state = node.game_state.copy()
+        self._apply_move(child_state, move)
+        self._node_count += 1
+        return node.add_child(move, child_state)
 
     def simulate(self, node: Node, depth_limit: int) -> float:
-        game = Game.from_state(node.game_state)
-        depth = 0
-        total_score = 0
-
         if node.is_terminal():
-            game_status = game.game_status
-            return self.evaluate(game_status)
-
-        while depth < depth_limit and game.game_status == 0:
-            possible_moves = game.get_possible_moves()
-            weights = [0.5 if move[1] else 1.0 for move in possible_moves]
-            move = random.choices(possible_moves, weights=weights)[0]
+            return self.evaluate(node.status)
 
-            self._apply_move(game, move)
+        # Rollout kernels reuse their buffers, so every search thread gets its own
+        rollout_kernel = getattr(self._rollout_kernels, 'kernel', None)
+        if rollout_kernel is None:
+            rollout_kernel = self._rollout_kernels.kernel = RolloutKernel()
 
-            game_status = game.game_status
-            total_score += self.evaluate(game_status)
-            depth += 1
+        # Only the final position of a rollout can score, ongoing games are worth 0
+        return self.evaluate(rollout_kernel.run(node.game_state, self.id - 1, depth_limit))
 
-        return total_score
-
-    def _apply_move(self, game: Game, move: Tuple[Card, bool]) -> None:
+    def _apply_move(self, game_state: GameState, move: int) -> None:
         """
         Applies a move.
 
         If it's the current player's turn, normal game rules apply.
         If it's the opponent's turn, the move is played without accessing his hand. Card draw and discards don't take effect.
         Args:
-            game (Game): The current game instance.
-            move (Tuple[Card, bool]): A tuple representing the move (card, discarded).
+            game_state (GameState): The state to update in place.
+            move (int): The move code, see models.MoveGenerator.encode_move.
         """
-        assert game.current_player is not None
-
-        if self.is_current_player(game.current_player.id):
-            game.apply_move(move)
-            return
-
-        card, discarded = move
-        if not discarded:
-            game.use_card_effect(game.current_player, card)
-            game.current_player.spend_resources(card)
-
-        game.update_resources(game.get_other_player(game.current_player))
-        game.set_game_status()
-
-        if game.game_status == 0:
-            game.change_current_player()
+        game_state.apply_move_code(move, from_hand=self.is_current_player(game_state.current_player_id))
 
     def backpropagate(self, node: Node, result: float) -> None:
         """Backpropagate the simulation result through the tree."""
+        node.release_state()
         while node is not None:
             node.update(result)
             node = node.parent
@@ -213,10 +893,10 @@ class MCTSAIPlayer(AIPlayer):
             return
             
         indent = "  " * depth  # Indentation to represent tree depth
-        move = node.move[0].name if node.move else "Root"
+        move = DeckManager.load_all_cards()[decode_move(node.move)[0]].name if node.move is not None else "Root"
         visits = node.visits
         score = node.score
-        ucb1 = node.ucb1_value() if node.parent else "N/A"
+        ucb1 = node.ucb1_value(self.exploration_weight) if node.parent else "N/A"
         print(f'{indent}- Move: {move}, Visits: {visits}, Score: {score:.2f}, UCB1: {ucb1}')
         
         for child in node.children:
@@ -1,33 +1,175 @@
-import torch
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Optional, Tuple
 from models.MCTSAIPlayer import MCTSAIPlayer, Node
-from models.ValueNet import ValueNet
-from ml_utils.feature_processing import build_feature_tensor, extract_features_from_state
-from typing import Tuple
+from models.NumpyValueNet import NumpyValueNet
+from models.EvaluationCache import EvaluationCache
+from ml_utils.feature_processing import NUM_FEATURES, encode_game_state
+
+BACKENDS = ('numpy', 'torch')
+TORCH_WEIGHT_DTYPES = ('float32', 'int8')  # int8 loads the quantized export of export_model.py
+MODEL_FILE_SUFFIXES = ('.npz', '.int8.pt', '.ts.pt')  # Files next to model_path the backends may load instead of it
 
 class MCTSNNAIPlayer(MCTSAIPlayer):
     def __init__(self, id: int, name: str, 
                  model_path: str = 'value_net.pth',
                  preferred_deck_file: str = 'default_deck.json',
                  iterations: int = 2000,
-                 device: str ='cpu'):
-        super().__init__(id, name, preferred_deck_file, depth_limit=0, iterations=iterations)
+                 device: str ='cpu',
+                 batch_size: int = 16,
+                 backend: str = 'numpy',
+                 weights_dtype: str = 'float32',
+                 cache_size: int = 50000,
+                 **search_options):
+        super().__init__(id, name, preferred_deck_file, depth_limit=0, iterations=iterations, **search_options)
+        if batch_size < 1:
+            raise ValueError('Batch size must be positive')
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown backend: {backend}')
+        if backend == 'numpy' and device != 'cpu':
+            raise ValueError('The numpy backend only runs on the cpu')
+        if backend == 'torch' and weights_dtype not in TORCH_WEIGHT_DTYPES:
+            raise ValueError(f'Unknown weights dtype for the torch backend: {weights_dtype}')
+        if cache_size < 0:
+            raise ValueError('Evaluation cache size cannot be negative')
+        self.model_path = model_path
+        self.batch_size = batch_size  # Leaves evaluated by a single forward pass
 
-        self.device = torch.device(device)
-        self.model = ValueNet().to(self.device)
-        state_dict = torch.load(model_path, map_location=self.device)
-        self.model.load_state_dict(state_dict)
-        self.model.eval()
+        self.backend = backend
+        self.weights_dtype = weights_dtype
+        if backend == 'numpy':
+            self.device = device
+        else:
+            import torch
+            self.device = torch.device(device)
+        self._model_signature: tuple = ()
+        self.load_model()
 
-    def state_to_tensor(self, game_state: dict, move: Tuple) -> torch.Tensor:
-        features = extract_features_from_state(game_state, move)
-        return build_feature_tensor(features).to(self.device)
+        # Network values of evaluated positions are kept across searches, until the model files change
+        self.cache_size = cache_size
+        self.evaluation_cache = EvaluationCache(cache_size) if cache_size > 0 else None
 
-    def simulate(self, node: Node, depth_limit: int) -> float:
-        if node.is_terminal() or node.game_state['current_player_id'] != self.id:
-            return self.evaluate(node.game_state['game_status'])
+        # Network inputs are encoded straight into a batch buffer, one per searching thread
+        self._feature_buffers = threading.local()
+
+    def load_model(self) -> None:
+        """Loads the network from model_path and remembers the state of the model files."""
+        self._model_signature = self.model_signature()
+        if self.backend == 'numpy':
+            # Runs without torch when the weights are available as an .npz file (see NumpyValueNet.load)
+            self.model = NumpyValueNet.load(self.model_path, self.weights_dtype)
+        else:
+            # Loads an up-to-date TorchScript export of export_model.py when there is one, see load_inference_model
+            from models.ValueNet import load_inference_model
+            self.model = load_inference_model(self.model_path, self.device, quantized=self.weights_dtype == 'int8')
+
+    def model_signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """Path, modification time and size of model_path and of the exports next to it that exist."""
+        model_path = Path(self.model_path)
+        paths = [model_path] + [model_path.with_suffix(suffix) for suffix in MODEL_FILE_SUFFIXES]
+        signature = []
+        for path in paths:
+            if path.exists():
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def reload_model_if_changed(self) -> bool:
+        """Reloads the network and empties the evaluation cache when a model file changed since loading."""
+        if self.model_signature() == self._model_signature:
+            return False
+        self.load_model()
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.clear()
+        return True
+
+    def mcts(self, game_state: dict, time_limit: Optional[float] = None) -> Tuple[Optional[object], bool]:
+        self.stop_pondering()
+        self.reload_model_if_changed()
+        return super().mcts(game_state, time_limit)
+
+    def close(self) -> None:
+        super().close()
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.clear()
+
+    def get_worker_kwargs(self) -> dict:
+        worker_kwargs = super().get_worker_kwargs()
+        del worker_kwargs['depth_limit']
+        worker_kwargs.update(
+            model_path=self.model_path, device=str(self.device), batch_size=self.batch_size,
+            backend=self.backend, weights_dtype=self.weights_dtype, cache_size=self.cache_size
+        )
+        return worker_kwargs
+
+    def encode_batch(self, nodes: list[Node]) -> np.ndarray:
+        """Encodes the network inputs of the nodes into the rows of this thread's feature buffer."""
+        buffer = getattr(self._feature_buffers, 'buffer', None)
+        if buffer is None or len(buffer) < len(nodes):
+            buffer = np.zeros((max(len(nodes), self.batch_size), NUM_FEATURES), dtype=np.float32)
+            self._feature_buffers.buffer = buffer
+        for row, node in zip(buffer, nodes):
+            encode_game_state(node.game_state, node.move, row)
+        return buffer[:len(nodes)]
 
-        state_tensor = self.state_to_tensor(node.game_state, node.move)
+    def needs_network(self, node: Node) -> bool:
+        """Only non-terminal positions with the agent to move are valued by the network."""
+        return not node.is_terminal() and node.game_state.current_player_id == self.id
+
+    def evaluate_batch(self, nodes: list[Node]) -> list[float]:
+        """Values all nodes, the ones missing from the evaluation cache with one forward pass."""
+        cache = self.evaluation_cache
+        if cache is None:
+            return self.run_network(nodes)
+
+        keys = []
+        for node in nodes:
+            game_state = node.game_state
+            keys.append((game_state.hash, game_state.turn, node.move))
+        values = [cache.get(key) for key in keys]
+        missing = [idx for idx, value in enumerate(values) if value is None]
+        if missing:
+            for idx, value in zip(missing, self.run_network([nodes[idx] for idx in missing])):
+                values[idx] = value
+                cache.put(keys[idx], value)
+        return values
+
+    def run_network(self, nodes: list[Node]) -> list[float]:
+        """Values all nodes with one forward pass."""
+        batch = self.encode_batch(nodes)
+        if self.backend == 'numpy':
+            return self.model(batch).tolist()
+
+        import torch
         with torch.no_grad():
-            value = self.model(state_tensor.unsqueeze(0))[0].item()
+            values = self.model(torch.from_numpy(batch).to(self.device))
+        return values.view(-1).tolist()
+
+    def simulate(self, node: Node, depth_limit: int) -> float:
+        if not self.needs_network(node):
+            return self.evaluate(node.status)
+        return self.evaluate_batch([node])[0]
+
+    def run_iterations(self, root: Node) -> None:
+        if self.batch_size == 1 or self.threads > 1:
+            super().run_iterations(root)
+            return
+
+        # Leaves waiting for the network keep a virtual loss on their path, steering the
+        # following selections of the same batch towards other leaves
+        completed = 0
+        while not self.is_budget_exhausted(completed, root.children_stats):
+            pending = []
+            while len(pending) < self.batch_size and completed + len(pending) < self.iterations:
+                node = self.select_node_parallel(root)
+                if self.needs_network(node):
+                    pending.append(node)
+                else:
+                    self.backpropagate_parallel(node, self.evaluate(node.status))
+                    completed += 1
 
-        return value
+            if pending:
+                for node, value in zip(pending, self.evaluate_batch(pending)):
+                    self.backpropagate_parallel(node, value)
+                completed += len(pending)
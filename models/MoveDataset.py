@@ -1,8 +1,11 @@
 import torch
-from torch.utils.data import Dataset
+import numpy as np
+from torch.utils.data import Dataset, DataLoader, BatchSampler, RandomSampler, SequentialSampler
 import pandas as pd
 from ast import literal_eval
-from ml_utils.feature_processing import build_feature_tensor
+from pathlib import Path
+from typing import Tuple, Union
+from ml_utils.feature_processing import NUM_FEATURES, build_feature_tensor, build_feature_vector
 
 class MoveDataset(Dataset):
     def __init__(self, csv_file):
@@ -33,3 +36,51 @@ class MoveDataset(Dataset):
             build_feature_tensor(features=row),
             torch.tensor(row['Label'], dtype=torch.float32)
         )
+
+def preprocessed_paths(csv_file: Union[str, Path]) -> Tuple[Path, Path]:
+    """Feature matrix and label files written next to the csv file by preprocess_move_data."""
+    csv_file = Path(csv_file)
+    return csv_file.with_suffix('.features.npy'), csv_file.with_suffix('.labels.npy')
+
+def preprocess_move_data(csv_file: Union[str, Path]) -> Tuple[Path, Path]:
+    """Encodes every move of the csv file once and writes the float32 features and labels as .npy files."""
+    features_path, labels_path = preprocessed_paths(csv_file)
+    data = MoveDataset(csv_file).data
+
+    features = np.lib.format.open_memmap(features_path, mode='w+', dtype=np.float32, shape=(len(data), NUM_FEATURES))
+    for idx, row in enumerate(data.to_dict('records')):
+        features[idx] = build_feature_vector(row)
+    features.flush()
+    del features
+
+    np.save(labels_path, data['Label'].to_numpy(dtype=np.float32))
+    return features_path, labels_path
+
+class MemmapMoveDataset(Dataset):
+    """
+    MoveDataset reading the files of preprocess_move_data through memory maps, preprocessing the
+    csv file first when they are missing or older than it.
+
+    A single index gives views of the mapped rows without copying them. A list of indices
+    (see batch_loader) gives a whole batch with one gather.
+    """
+    def __init__(self, csv_file: Union[str, Path]) -> None:
+        features_path, labels_path = preprocessed_paths(csv_file)
+        csv_mtime = Path(csv_file).stat().st_mtime
+        if not all(path.exists() and path.stat().st_mtime >= csv_mtime for path in (features_path, labels_path)):
+            preprocess_move_data(csv_file)
+
+        # Copy-on-write maps, so tensors can share their memory (torch needs writable arrays)
+        self.features = np.load(features_path, mmap_mode='c')
+        self.labels = np.load(labels_path, mmap_mode='c')
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        return torch.from_numpy(self.features[idx]), torch.from_numpy(np.asarray(self.labels[idx]))
+
+def batch_loader(dataset: Dataset, batch_size: int, shuffle: bool = False) -> DataLoader:
+    """DataLoader fetching every batch of a MemmapMoveDataset (or a subset of it) with a single indexing call."""
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
@@ -0,0 +1,47 @@
+from bisect import bisect_right
+from typing import Tuple
+from models.Card import Card
+
+# Moves are encoded as card_index * 2 + discarded
+def encode_move(card: int, discarded: bool) -> int:
+    return card * 2 + int(discarded)
+
+def decode_move(move: int) -> Tuple[int, bool]:
+    return move >> 1, bool(move & 1)
+
+class MoveGenerator:
+    """
+    Computes bitmasks of playable card indices (bit i set for card i) from resource stocks.
+
+    Cards are grouped by the resource they cost and sorted by cost, so the cards affordable
+    with a given stock are a prefix of that list whose mask is precomputed.
+    """
+    def __init__(self, cards: list[Card], resource_type_count: int = 3) -> None:
+        self.card_count = len(cards)
+        self.thresholds = []
+        self.prefix_masks = []
+
+        for resource_type in range(resource_type_count):
+            by_cost = sorted(
+                (card.cost, card_index) for card_index, card in enumerate(cards)
+                if int(card.material_type) == resource_type
+            )
+            prefix_masks = [0]
+            for _, card_index in by_cost:
+                prefix_masks.append(prefix_masks[-1] | (1 << card_index))
+
+            self.thresholds.append([cost for cost, _ in by_cost])
+            self.prefix_masks.append(prefix_masks)
+
+    def resource_mask(self, resource_type: int, stock: int) -> int:
+        """Mask of the cards paid with resource_type that are affordable with the given stock."""
+        return self.prefix_masks[resource_type][bisect_right(self.thresholds[resource_type], stock)]
+
+    def play_moves(self, mask: int) -> list[int]:
+        """Move codes playing every card set in the mask, in card index order."""
+        moves = []
+        while mask:
+            lowest_bit = mask & -mask
+            moves.append(encode_move(lowest_bit.bit_length() - 1, False))
+            mask ^= lowest_bit
+        return moves
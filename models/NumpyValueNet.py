@@ -0,0 +1,83 @@
+import numpy as np
+from pathlib import Path
+from typing import Union
+
+LAYERS = ('fc1', 'fc2', 'fc3', 'fc4', 'output')  # Linear layers of ValueNet, in order
+WEIGHT_DTYPES = ('float32', 'bfloat16')
+
+def round_to_bfloat16(values: np.ndarray) -> np.ndarray:
+    """Rounds float32 values to the nearest bfloat16 (ties to even), returned as float32."""
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+    rounded = (bits + np.uint32(0x7FFF) + ((bits >> 16) & np.uint32(1))) & np.uint32(0xFFFF0000)
+    return rounded.view(np.float32)
+
+class NumpyValueNet:
+    """
+    Inference-only ValueNet running on NumPy, so the network can be used without torch.
+
+    Weights are stored transposed and contiguous, so a batch goes through every layer with a
+    single matmul. Dropout is left out, as in ValueNet's eval mode. With bfloat16 weights, the
+    weights are rounded to bfloat16 precision and the arithmetic stays in float32.
+    """
+    __slots__ = ('weights', 'biases', 'weights_dtype')
+
+    def __init__(self, state_dict: dict, weights_dtype: str = 'float32') -> None:
+        if weights_dtype not in WEIGHT_DTYPES:
+            raise ValueError(f'Unknown weights dtype: {weights_dtype}')
+        self.weights_dtype = weights_dtype
+        self.weights: list[np.ndarray] = []
+        self.biases: list[np.ndarray] = []
+        for layer in LAYERS:
+            weight = np.ascontiguousarray(self._to_numpy(state_dict[f'{layer}.weight']).T, dtype=np.float32)
+            if weights_dtype == 'bfloat16':
+                weight = round_to_bfloat16(weight)
+            self.weights.append(weight)
+            self.biases.append(self._to_numpy(state_dict[f'{layer}.bias']).astype(np.float32))
+
+    @staticmethod
+    def _to_numpy(values) -> np.ndarray:
+        if isinstance(values, np.ndarray):
+            return values
+        return values.detach().cpu().numpy()  # torch.Tensor
+
+    @classmethod
+    def load(cls, path: Union[str, Path], weights_dtype: str = 'float32') -> 'NumpyValueNet':
+        """
+        Loads weights saved by save (.npz) or a ValueNet state_dict saved by torch. For a torch
+        file, the .npz file next to it (train.py saves both) is loaded instead when it is not
+        older, or when torch is missing.
+        """
+        path = Path(path)
+        if path.suffix != '.npz':
+            npz_path = path.with_suffix('.npz')
+            if npz_path.exists() and npz_path.stat().st_mtime >= path.stat().st_mtime:
+                path = npz_path
+            else:
+                try:
+                    import torch
+                except ImportError:
+                    path = npz_path
+                else:
+                    return cls(torch.load(path, map_location='cpu'), weights_dtype)
+
+        with np.load(path) as arrays:
+            return cls(dict(arrays), weights_dtype)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Saves the weights as an .npz file with the names and layout of the ValueNet state_dict."""
+        arrays = {}
+        for layer, weight, bias in zip(LAYERS, self.weights, self.biases):
+            arrays[f'{layer}.weight'] = weight.T
+            arrays[f'{layer}.bias'] = bias
+        np.savez(path, **arrays)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        """Values a (batch, features) float32 array, returning one value per row."""
+        x = features
+        for weight, bias in zip(self.weights[:-1], self.biases[:-1]):
+            x = x @ weight
+            x += bias
+            np.maximum(x, 0, out=x)
+        x = x @ self.weights[-1]
+        x += self.biases[-1]
+        return x[:, 0]
@@ -150,13 +150,9 @@ class Player:
             for idx in range(len(resource_type)):
                 resource_type[idx] = max(1, resource_type[idx] + value)
     
-    def add_to_resource_based_on_action(self, action, value) -> None:
-        for resource_type, resource_info in resource_names.items():
-            for idx, resource_name in enumerate(resource_info):
-                if resource_name in action:
-                    self.resources[int(resource_type)][idx] = max(0, self.resources[int(resource_type)][idx] + value)
-                    return
-        raise ValueError(f'Invalid action "{action}" not found in resource names: {list(resource_names.keys())}')
+    def add_to_resource(self, resource_type, idx, value) -> None:
+        """Adds value to the income (idx 0) or stock (idx 1) of the given resource type"""
+        self.resources[resource_type][idx] = max(0, self.resources[resource_type][idx] + value)
 
     def spend_resources(self, card) -> None:
         self.resources[int(card.material_type)][1] -= card.cost
@@ -0,0 +1,152 @@
+from random import random, shuffle
+from models.GameState import GameState, CARD_ACTIONS, CARD_COSTS, CARD_STOCK_OFFSETS, HAND_SIZE, EMPTY_SLOT
+from models.CardEffect import OP_DAMAGE, OP_CASTLE, OP_FENCE, OP_STACKS, OP_ALL, OP_TRANSFER, OP_RESOURCE, TARGET_ENEMY
+
+SLOT_UNITS = 3 * HAND_SIZE
+
+class RolloutKernel:
+    """
+    Plays random games on preallocated buffers, for the simulation step of the search.
+
+    Moves are drawn like MCTSAIPlayer.simulate always did: every playable hand card with weight 1
+    and every hand card discard with weight 0.5, by rejection sampling over the hand slots. The agent plays under the normal rules, the
+    opponent plays cards from its hand without discarding or drawing. The buffers are reused by
+    every rollout and nothing is hashed, so a kernel must not be shared between threads.
+    """
+    __slots__ = ('castle', 'fence', 'resources', 'hands', 'decks', 'deck_sizes', 'deck_templates')
+
+    def __init__(self) -> None:
+        self.castle = [0, 0]
+        self.fence = [0, 0]
+        self.resources = [0] * 12
+        self.hands = [EMPTY_SLOT] * (2 * HAND_SIZE)
+        self.decks = [(), ()]
+        self.deck_sizes = [0, 0]
+        self.deck_templates = ((), ())
+
+    def run(self, state: GameState, agent: int, depth_limit: int) -> int:
+        """Plays at most depth_limit moves from state (left unchanged) and returns the final game status."""
+        castle, fence, resources, hands = self.castle, self.fence, self.resources, self.hands
+        castle[:] = state.castle
+        fence[:] = state.fence
+        resources[:] = state.resources
+        hands[:] = state.hands
+        self.decks[:] = state.decks
+        self.deck_sizes[:] = state.deck_sizes
+        self.deck_templates = state.deck_templates
+
+        # Only the agent's hand size changes: it drops by one on a discard until the next draw
+        agent_base = agent * HAND_SIZE
+        agent_hand_size = HAND_SIZE - hands[agent_base:agent_base + HAND_SIZE].count(EMPTY_SLOT)
+        opponent_base = (1 - agent) * HAND_SIZE
+        opponent_hand_size = HAND_SIZE - hands[opponent_base:opponent_base + HAND_SIZE].count(EMPTY_SLOT)
+
+        decks, deck_sizes = self.decks, self.deck_sizes
+        stock_offsets, costs, use_card_effect = CARD_STOCK_OFFSETS, CARD_COSTS, self.use_card_effect
+        current = state.current
+        status = state.status
+        depth = 0
+        while depth < depth_limit and status == 0:
+            if (agent_hand_size if current == agent else opponent_hand_size) == 0:
+                break
+            hand_base = current * HAND_SIZE
+            resource_base = current * 6
+
+            # Rejection sampling over 3 units per hand slot: 1 for the discard, 2 for the play.
+            # Units of empty slots and plays of unaffordable cards are drawn again.
+            while True:
+                pick = int(random() * SLOT_UNITS)
+                slot = hand_base + pick // 3
+                card = hands[slot]
+                if card == EMPTY_SLOT:
+                    continue
+                discarded = pick % 3 == 0
+                if discarded or resources[resource_base + stock_offsets[card]] >= costs[card]:
+                    break
+
+            if not discarded:
+                use_card_effect(current, card)
+                resources[resource_base + stock_offsets[card]] -= costs[card]
+
+            if current == agent:
+                hands[slot] = EMPTY_SLOT
+                agent_hand_size -= 1
+
+            income_base = (1 - current) * 6
+            resources[income_base + 1] += resources[income_base]
+            resources[income_base + 3] += resources[income_base + 2]
+            resources[income_base + 5] += resources[income_base + 4]
+
+            castle1, castle2 = castle
+            if castle1 <= 0 and castle2 <= 0:
+                status = -1
+            elif castle1 >= 100 and castle2 >= 100:
+                status = -1
+            elif castle1 >= 100:
+                status = 1
+            elif castle2 >= 100:
+                status = 2
+            elif castle1 <= 0:
+                status = 2
+            elif castle2 <= 0:
+                status = 1
+            elif agent_hand_size == 0 and opponent_hand_size == 0:
+                status = -1
+
+            if status == 0:
+                if current == agent:
+                    if deck_sizes[agent] == 0:
+                        self.refill_deck(agent)
+                    deck_sizes[agent] -= 1
+                    hands[slot] = decks[agent][deck_sizes[agent]]
+                    agent_hand_size += 1
+                current = 1 - current
+            depth += 1
+
+        return status
+
+    def refill_deck(self, player: int) -> None:
+        """Replaces the player's empty deck with a shuffled copy of its deck template."""
+        deck_cards = list(self.deck_templates[player])
+        shuffle(deck_cards)
+        self.decks[player] = tuple(deck_cards)
+        self.deck_sizes[player] = len(deck_cards)
+
+    def use_card_effect(self, player: int, card: int) -> None:
+        """Same effects as GameState.use_card_effect."""
+        castle, fence, resources = self.castle, self.fence, self.resources
+        for opcode, target, value in CARD_ACTIONS[card]:
+            target_player = 1 - player if target == TARGET_ENEMY else player
+            base = target_player * 6
+            if opcode == OP_DAMAGE:
+                fence_hp = fence[target_player]
+                if fence_hp >= value:
+                    fence[target_player] = fence_hp - value
+                else:
+                    fence[target_player] = 0
+                    castle_hp = castle[target_player] - (value - fence_hp)
+                    castle[target_player] = castle_hp if castle_hp > 0 else 0
+            elif opcode == OP_CASTLE:
+                castle_hp = castle[target_player] + value
+                castle[target_player] = castle_hp if castle_hp > 0 else 0
+            elif opcode == OP_FENCE:
+                fence_hp = fence[target_player] + value
+                fence[target_player] = fence_hp if fence_hp > 0 else 0
+            elif opcode == OP_STACKS:
+                for idx in range(base + 1, base + 6, 2):
+                    resources[idx] = max(0, resources[idx] + value)
+            elif opcode == OP_ALL:
+                castle[target_player] = max(0, castle[target_player] + value)
+                fence[target_player] = max(0, fence[target_player] + value)
+                for idx in range(base, base + 6):
+                    resources[idx] = max(1, resources[idx] + value)
+            elif opcode == OP_TRANSFER:
+                destination_base = (1 - target_player) * 6
+                for offset in range(1, 6, 2):
+                    amount = min(resources[base + offset], value)
+                    resources[base + offset] -= amount
+                    resources[destination_base + offset] += amount
+            else:
+                idx = base + opcode - OP_RESOURCE
+                stock = resources[idx] + value
+                resources[idx] = stock if stock > 0 else 0
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Optional
+from models.GameState import GameState
+
+class TranspositionNode:
+    """
+    Search node shared by every path reaching the same position.
+
+    Children are stored as move codes with the hash of the position they lead to (None until
+    the move is first selected), so nodes only reference each other through the table. A node
+    can be reached through several moves, the one leading to it is only known on a path.
+    """
+    __slots__ = ('game_state', 'status', 'moves', 'child_keys', 'visits', 'score', 'is_agent_turn_next')
+
+    def __init__(self, game_state: GameState, moves: list[int], is_agent_turn_next: bool) -> None:
+        self.game_state = game_state
+        self.status = game_state.status
+        self.moves = moves
+        self.child_keys: list[Optional[int]] = [None] * len(moves)
+        self.visits = 0
+        self.score = 0.0
+        self.is_agent_turn_next = is_agent_turn_next
+
+    def is_terminal(self) -> bool:
+        return self.status in (1, 2, -1)
+
+    def update(self, result: float) -> None:
+        self.visits += 1
+        self.score += result
+
+class TranspositionTable:
+    """Bounded map from position hashes to nodes with least-recently-used replacement."""
+    def __init__(self, capacity: int = 20000) -> None:
+        if capacity < 1:
+            raise ValueError('Transposition table capacity must be positive')
+        self.capacity = capacity
+        self.entries: OrderedDict[int, TranspositionNode] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int) -> Optional[TranspositionNode]:
+        """Returns the node stored for key, marking it as recently used."""
+        node = self.entries.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return node
+
+    def peek(self, key: int) -> Optional[TranspositionNode]:
+        """Returns the node stored for key without touching the replacement order or statistics."""
+        return self.entries.get(key)
+
+    def put(self, key: int, node: TranspositionNode) -> None:
+        """Stores a node, evicting the least recently used one when the table is full."""
+        self.entries[key] = node
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,135 @@
+import math
+import numpy as np
+from typing import Tuple
+from models.GameState import GameState
+
+NODE_ARRAYS = ('visits', 'score', 'parent', 'first_child', 'child_count', 'tried_count', 'move', 'status', 'agent_turn')
+
+class TreeStore:
+    """
+    Search tree kept in flat NumPy arrays indexed by node id, for searches too large for Node objects.
+
+    The children of a node take a contiguous block of ids, allocated for all of its moves when
+    the node is expanded, and the arrays double in size when full. Game states are only kept for
+    the root and for expanded nodes with at least kept_state_visits visits, which most
+    iterations pass through; other states are rebuilt by replaying the moves on their path.
+    The root has id 0 and the agent moves first from it.
+    """
+    __slots__ = ('size', 'capacity', 'visits', 'score', 'parent', 'first_child', 'child_count', 'tried_count', 'move', 'status', 'agent_turn', 'states', 'kept_state_visits')
+
+    def __init__(self, root_state: GameState, capacity: int = 1024, kept_state_visits: int = 8) -> None:
+        if capacity < 1:
+            raise ValueError('Tree capacity must be positive')
+        self.kept_state_visits = kept_state_visits
+        self.capacity = capacity
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.score = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)  # -1 until the node is expanded
+        self.child_count = np.zeros(capacity, dtype=np.int16)
+        self.tried_count = np.zeros(capacity, dtype=np.int16)  # Children are tried in order, before any UCB1 selection
+        self.move = np.full(capacity, -1, dtype=np.int16)
+        self.status = np.zeros(capacity, dtype=np.int8)  # Only known once the state was computed
+        self.agent_turn = np.zeros(capacity, dtype=np.bool_)
+        self.states: dict[int, GameState] = {}
+
+        self.size = 1
+        self.status[0] = root_state.status
+        self.agent_turn[0] = True
+        self.states[0] = root_state
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self, required: int) -> None:
+        capacity = self.capacity
+        while capacity < required:
+            capacity *= 2
+        for name in NODE_ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.first_child[self.size:] = -1
+        self.parent[self.size:] = -1
+        self.capacity = capacity
+
+    def is_expanded(self, node: int) -> bool:
+        return self.first_child[node] >= 0
+
+    def expand(self, node: int, moves: list[int]) -> None:
+        """Allocates the children of node, one per move."""
+        count = len(moves)
+        if self.size + count > self.capacity:
+            self._grow(self.size + count)
+        first = self.size
+        block = slice(first, first + count)
+        self.parent[block] = node
+        self.move[block] = moves
+        self.agent_turn[block] = not self.agent_turn[node]
+        self.first_child[node] = first
+        self.child_count[node] = count
+        self.size += count
+
+    def get_state(self, node: int) -> GameState:
+        """Returns the state of node, replaying the moves from its closest ancestor with a kept state."""
+        path = []
+        while node not in self.states:
+            path.append(node)
+            node = int(self.parent[node])
+        game_state = self.states[node]
+        for node in reversed(path):
+            game_state = self.get_child_state(node, game_state)
+        return game_state
+
+    def get_child_state(self, node: int, parent_state: GameState) -> GameState:
+        """Builds the state of node from the state of its parent and sets the node's status."""
+        parent = self.parent[node]
+        from_hand = bool(self.agent_turn[parent])
+        game_state = parent_state.copy()
+        game_state.apply_move_code(int(self.move[node]), from_hand=from_hand)
+        self.status[node] = game_state.status
+
+        # A draw from an empty deck reshuffles it, such a state could not be replayed the same way
+        if from_hand and parent_state.deck_sizes[parent_state.current] == 0:
+            self.states[node] = game_state
+        elif self.visits[node] >= self.kept_state_visits and self.first_child[node] >= 0:
+            self.states[node] = game_state
+        return game_state
+
+    def select_child(self, node: int, exploration_weight: float = 1) -> int:
+        """Returns the next untried child of node, or else the child with the highest UCB1 value."""
+        first = int(self.first_child[node])
+        tried = int(self.tried_count[node])
+        count = int(self.child_count[node])
+        if tried < count:
+            self.tried_count[node] = tried + 1
+            return first + tried
+
+        visits = self.visits[first:first + count]
+        values = self.score[first:first + count] / visits + exploration_weight * np.sqrt(math.log(self.visits[node]) / visits)
+        return first + int(values.argmax())
+
+    def backpropagate(self, node: int, result: float) -> None:
+        """Adds the simulation result to node and all of its ancestors."""
+        visits, score, parent = self.visits, self.score, self.parent
+        while node >= 0:
+            visits[node] += 1
+            score[node] += result
+            node = parent[node]
+
+    def children_stats(self, node: int = 0) -> list[Tuple[int, float, int]]:
+        """(move, score, visits) of every visited child."""
+        first = int(self.first_child[node])
+        if first < 0:
+            return []
+        block = slice(first, first + int(self.child_count[node]))
+        return [
+            (int(move), float(score), int(visits))
+            for move, score, visits in zip(self.move[block], self.score[block], self.visits[block])
+            if visits > 0
+        ]
+
+    def nbytes(self) -> int:
+        """Bytes taken by the node arrays, not counting the kept game states."""
+        return sum(getattr(self, name).nbytes for name in NODE_ARRAYS)
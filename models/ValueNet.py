@@ -1,6 +1,12 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from pathlib import Path
+from typing import Union
+
+# TorchScript exports written by export_model.py next to the state_dict file
+TORCHSCRIPT_SUFFIX = '.ts.pt'
+INT8_SUFFIX = '.int8.pt'
 
 class ValueNet(nn.Module):
     def __init__(self, input_size=78):
@@ -28,3 +34,27 @@ class ValueNet(nn.Module):
 
         x = self.output(x).squeeze(-1)
         return x
+
+def load_inference_model(model_path: Union[str, Path], device: Union[str, torch.device] = 'cpu', quantized: bool = False) -> nn.Module:
+    """
+    Loads the network for inference. A TorchScript file is loaded as is. For a state_dict file on
+    the cpu, the TorchScript export next to it is loaded instead if it is not older than the
+    state_dict (the exports are cpu-only). With quantized, the int8 export is tried first.
+    Otherwise the weights are loaded into a ValueNet.
+    """
+    model_path = Path(model_path)
+    device = torch.device(device)
+    if model_path.suffix == '.pt':
+        return torch.jit.load(model_path, map_location=device).eval()
+
+    if device.type == 'cpu':
+        model_mtime = model_path.stat().st_mtime
+        suffixes = (INT8_SUFFIX, TORCHSCRIPT_SUFFIX) if quantized else (TORCHSCRIPT_SUFFIX,)
+        for suffix in suffixes:
+            artifact_path = model_path.with_suffix(suffix)
+            if artifact_path.exists() and artifact_path.stat().st_mtime >= model_mtime:
+                return torch.jit.load(artifact_path, map_location=device).eval()
+
+    model = ValueNet().to(device)
+    model.load_state_dict(torch.load(model_path, map_location=device))
+    return model.eval()
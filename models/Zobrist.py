@@ -0,0 +1,43 @@
+import random
+
+# Hashed features, each keyed by (feature, value):
+# castle and fence HP per player, 6 resource values per player, count of each card in each hand
+CASTLE_FEATURE = 0
+FENCE_FEATURE = 2
+RESOURCE_FEATURE = 4
+HAND_FEATURE = 16
+CARD_COUNT = 30
+FEATURE_COUNT = HAND_FEATURE + 2 * CARD_COUNT
+
+TABLE_SIZE = 512  # Values outside [0, TABLE_SIZE) are keyed by mixing instead of a table lookup
+ZOBRIST_SEED = 20240601  # Fixed, so hashes match across processes and runs
+_MASK64 = (1 << 64) - 1
+
+_rng = random.Random(ZOBRIST_SEED)
+_KEYS = [[_rng.getrandbits(64) for _ in range(TABLE_SIZE)] for _ in range(FEATURE_COUNT)]
+SIDE_TO_MOVE_KEY = _rng.getrandbits(64)  # Mixed in when player2 is to move
+
+def _splitmix64(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+def zobrist_key(feature: int, value: int) -> int:
+    """Returns the 64-bit key of a feature having the given value."""
+    if 0 <= value < TABLE_SIZE:
+        return _KEYS[feature][value]
+    return _splitmix64((feature << 32) ^ (value & 0xFFFFFFFF))
+
+def hash_features(features: list[int], current: int) -> int:
+    """Computes the full hash of a FEATURE_COUNT long feature vector and the index of the player to move."""
+    h = SIDE_TO_MOVE_KEY if current else 0
+    for feature, value in enumerate(features):
+        h ^= zobrist_key(feature, value)
+    return h
+
+def update_hash(h: int, feature: int, old_value: int, new_value: int) -> int:
+    """Returns the hash with one feature changed from old_value to new_value."""
+    if old_value == new_value:
+        return h
+    return h ^ zobrist_key(feature, old_value) ^ zobrist_key(feature, new_value)
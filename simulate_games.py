@@ -1,14 +1,17 @@
 import os
 from Game import Game
+from BatchGame import BatchGame
 from models.BasicAIPlayer import BasicAIPlayer
 from models.MCTSNNAIPlayer import MCTSNNAIPlayer
 from models.RuleBasedAIPlayer import RuleBasedAIPlayer
 from models.MCTSAIPlayer import MCTSAIPlayer
+from models.AIPlayer import AIPlayer
 from utils.GameLogger import GameLogger
 from config.config import Config
 from argparse import ArgumentParser
 from typing import Optional
 from multiprocessing import Pool
+from functools import partial
 
 NUM_THREADS = os.cpu_count()
 
@@ -71,18 +74,43 @@ def play_game(player1_type: type, player2_type: type, player1_deck: str, player2
     )
     while game_instance.game_status == 0:
         handle_turn(game_instance, logger)
+
+    for player in (game_instance.player1, game_instance.player2):
+        if isinstance(player, AIPlayer):
+            player.close()
     
     return game_instance.game_status
 
+def configure_player_type(player_type: type, mcts_options: dict):
+    """Binds search options to MCTS player types, other player types are returned unchanged."""
+    if mcts_options and isinstance(player_type, type) and issubclass(player_type, MCTSAIPlayer):
+        return partial(player_type, **mcts_options)
+    return player_type
+
 def run_game_simulation(game_params: tuple) -> int:
     player1_type, player2_type, player1_deck, player2_deck, enable_logs = game_params
     return play_game(player1_type, player2_type, player1_deck, player2_deck, enable_logs)
 
-def simulate_games(num_games: int, player1_type: type, player2_type: type, player1_deck: str, player2_deck: str, enable_logs: bool, parallel: bool) -> None:
+def simulate_batched_games(num_games: int, player1_deck: str, player2_deck: str, enable_logs: bool) -> list[int]:
+    """Plays all games at once on a BatchGame using the BasicAIPlayer policy."""
+    batch_game = BatchGame(num_games, player1_deck, player2_deck, record=enable_logs)
+    results = batch_game.play(policy='basic').tolist()
+
+    if enable_logs:
+        for game_rows in batch_game.get_log_rows():
+            GameLogger().log_rows(game_rows)
+
+    return results
+
+def simulate_games(num_games: int, player1_type: type, player2_type: type, player1_deck: str, player2_deck: str, enable_logs: bool, parallel: bool, batched: bool = False) -> None:
     # Prepare the parameters for each game
     game_params = (player1_type, player2_type, player1_deck, player2_deck, enable_logs)
     
-    if num_games == 1 or not parallel:
+    if batched:
+        if player1_type is not BasicAIPlayer or player2_type is not BasicAIPlayer:
+            raise ValueError('Batched simulation only supports BasicAIPlayer')
+        results = simulate_batched_games(num_games, player1_deck, player2_deck, enable_logs)
+    elif num_games == 1 or not parallel:
         # Single game or parallelism disabled
         results = [run_game_simulation(game_params) for _ in range(num_games)]
     else:
@@ -109,11 +137,35 @@ if __name__ == '__main__':
     parser.add_argument('-player2_deck', type=str, default='default_deck', help='name of the player2 deck')
     parser.add_argument('--enable_logs', action='store_true', help='enable game state logging')
     parser.add_argument('--parallel', action='store_true', help='improve game simulation by parallel computing')
+    parser.add_argument('--batched', action='store_true', help='play all games at once with the vectorized engine (BasicAIPlayer only)')
+    parser.add_argument('-mcts_threads', type=int, default=1, help='threads sharing one MCTS tree per decision (tree-parallel search)')
+    parser.add_argument('-mcts_exploration', type=float, default=None, help='UCB1 exploration constant of MCTS players (default 1)')
+    parser.add_argument('-mcts_time_limit', type=float, default=None, help='seconds per MCTS decision, the iteration count stays an upper bound')
+    parser.add_argument('--mcts_early_stop', action='store_true', help='end MCTS decisions once the most visited move can no longer be overtaken')
+    parser.add_argument('--mcts_compact_tree', action='store_true', help='keep MCTS trees in flat arrays, for long searches with little memory')
+    parser.add_argument('--mcts_ponder', action='store_true', help='let MCTS players search during the opponent\'s turn')
+    parser.add_argument('-mcts_workers', type=int, default=1, help='worker processes per MCTS decision (root-parallel search, not combined with --parallel)')
     args = parser.parse_args()
 
     try:
-        player1_type = player_types.get(args.player1_type)
-        player2_type = player_types.get(args.player2_type)
+        mcts_options = {}
+        if args.mcts_workers > 1:
+            mcts_options['workers'] = args.mcts_workers
+        if args.mcts_threads > 1:
+            mcts_options['threads'] = args.mcts_threads
+        if args.mcts_exploration is not None:
+            mcts_options['exploration_weight'] = args.mcts_exploration
+        if args.mcts_time_limit is not None:
+            mcts_options['time_limit'] = args.mcts_time_limit
+        if args.mcts_early_stop:
+            mcts_options['early_stop'] = True
+        if args.mcts_compact_tree:
+            mcts_options['compact_tree'] = True
+        if args.mcts_ponder:
+            mcts_options['ponder'] = True
+
+        player1_type = configure_player_type(player_types.get(args.player1_type), mcts_options)
+        player2_type = configure_player_type(player_types.get(args.player2_type), mcts_options)
         args.player1_deck += '.json'
         args.player2_deck += '.json'
 
@@ -124,7 +176,8 @@ if __name__ == '__main__':
             player1_deck=args.player1_deck,
             player2_deck=args.player2_deck,
             enable_logs=args.enable_logs,
-            parallel=args.parallel
+            parallel=args.parallel,
+            batched=args.batched
         )
     except ValueError as e:
         print(f'Error: {e}')
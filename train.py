@@ -1,26 +1,34 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, random_split
+from torch.utils.data import random_split
 from torch.optim.lr_scheduler import ReduceLROnPlateau
-from models.MoveDataset import MoveDataset
+from models.MoveDataset import MemmapMoveDataset, batch_loader
 from models.ValueNet import ValueNet
+from models.NumpyValueNet import NumpyValueNet
 from argparse import ArgumentParser
 
+TRAIN_SPLIT = 0.8
+SPLIT_SEED = 0  # Fixed, so export_model.py checks exports on the same held-out moves
+
+def split_dataset(dataset):
+    """Splits the dataset into the training and the held-out validation part."""
+    train_size = int(TRAIN_SPLIT * len(dataset))
+    val_size = len(dataset) - train_size
+    return random_split(dataset, [train_size, val_size], generator=torch.Generator().manual_seed(SPLIT_SEED))
+
 def train(device='cpu', resume_path=None):
     csv_file = 'move_data.csv'
     batch_size = 1024
     learning_rate = 1e-3
     epochs = 50
-    train_split = 0.8
 
-    full_dataset = MoveDataset(csv_file)
-    train_size = int(train_split * len(full_dataset))
-    val_size = len(full_dataset) - train_size
-    train_dataset, val_dataset = random_split(full_dataset, [train_size, val_size])
+    # The csv file is encoded once into memory-mapped .npy files next to it
+    full_dataset = MemmapMoveDataset(csv_file)
+    train_dataset, val_dataset = split_dataset(full_dataset)
 
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size)
+    train_loader = batch_loader(train_dataset, batch_size, shuffle=True)
+    val_loader = batch_loader(val_dataset, batch_size)
 
     model = ValueNet().to(device)
 
@@ -79,7 +87,8 @@ def train(device='cpu', resume_path=None):
 
 
     torch.save(model.state_dict(), 'value_net.pth')
-    print('Model saved to value_net.pth')
+    NumpyValueNet(model.state_dict()).save('value_net.npz')
+    print('Model saved to value_net.pth and value_net.npz')
 
 if __name__ == "__main__":
     parser = ArgumentParser()
@@ -39,28 +39,32 @@ class GameLogger:
         return csv_file
 
     def log_move(self, game_data, card_played, card_discarded) -> None:
+        current_player = game_data.current_player
+        other_player = game_data.get_other_player(current_player)
+        self.log_rows([[
+            game_data.turn_count,
+            current_player.id,
+            other_player.id,
+            current_player.castle_hp,
+            current_player.fence_hp,
+            self._flatten_resources(current_player.resources),
+            [card.id for card in current_player.hand if isinstance(card, Card)],
+            other_player.castle_hp,
+            other_player.fence_hp,
+            self._flatten_resources(other_player.resources),
+            card_played.id,
+            card_discarded,
+            game_data.game_status
+        ]])
+
+    def log_rows(self, rows: list[list]) -> None:
+        """Appends already built rows (in header order) to the log file."""
         if not self.game_state_log_file.is_file():
             raise FileNotFoundError('Cannot find the game_state_data.csv file!')
 
         with self.game_state_log_file.open(mode='a', newline='') as file:
             writer = csv.writer(file)
-            current_player = game_data.current_player
-            other_player = game_data.get_other_player(current_player)
-            writer.writerow([
-                game_data.turn_count,
-                current_player.id,
-                other_player.id,
-                current_player.castle_hp,
-                current_player.fence_hp,
-                self._flatten_resources(current_player.resources),
-                [card.id for card in current_player.hand if isinstance(card, Card)],
-                other_player.castle_hp,
-                other_player.fence_hp,
-                self._flatten_resources(other_player.resources),
-                card_played.id,
-                card_discarded,
-                game_data.game_status
-            ])
+            writer.writerows(rows)
 
     def generate_unique_filename(self) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,56 @@
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from DeckManager import DeckManager
+from models.AIPlayer import AIPlayer
+from models.MCTSAIPlayer import MCTSAIPlayer
+from models.MoveGenerator import decode_move
+
+class AIWorker(QObject):
+    """
+    Runs the turns of an AI player on its own QThread, so searches don't block the GUI.
+
+    Turns are requested with request_turn and the game state, the chosen move comes back
+    through move_ready. Search based players also report their progress.
+    """
+    turn_requested = pyqtSignal(object)
+    move_ready = pyqtSignal(object, bool)
+    progress = pyqtSignal(int, object, int)  # Iterations so far, most visited card and its visits
+
+    def __init__(self, player: AIPlayer) -> None:
+        super().__init__()
+        self.player = player
+        self.stopped = False
+        if isinstance(player, MCTSAIPlayer):
+            player.progress_callback = self.report_progress
+
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self.turn_requested.connect(self.take_turn)
+        self.thread.start()
+
+    def request_turn(self, game_state: dict) -> None:
+        """Queues a turn on the worker thread. Called from the GUI thread."""
+        if isinstance(self.player, MCTSAIPlayer):
+            self.player.reset_cancel()
+        self.turn_requested.emit(game_state)
+
+    @pyqtSlot(object)
+    def take_turn(self, game_state: dict) -> None:
+        if self.stopped:
+            return  # Requested before stop, but not started yet
+        card, discarded = self.player.take_turn(game_state)
+        self.move_ready.emit(card, discarded)
+
+    def report_progress(self, iterations: int, root_stats: list) -> None:
+        if not root_stats:
+            return
+        move, _, visits = self.player.best_root_stat(root_stats)  # The move that would be played now
+        card = DeckManager.load_all_cards()[decode_move(move)[0]]
+        self.progress.emit(iterations, card, visits)
+
+    def stop(self) -> None:
+        """Cancels a running or requested search and waits for the thread to finish."""
+        self.stopped = True
+        if isinstance(self.player, MCTSAIPlayer):
+            self.player.cancel()
+        self.thread.quit()
+        self.thread.wait()
@@ -2,13 +2,14 @@ import resources.resources_ui  # Loads in all resource files into ui
 from PyQt6 import uic
 from PyQt6.QtWidgets import QLabel, QFrame, QHBoxLayout, QWidget, QPushButton, QApplication
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt, QEvent, QTimer
+from PyQt6.QtCore import Qt, QEvent
 from views.components.CardLabel import CardLabel
 from views.components.CardDiscardLabel import CardDiscardLabel
 from views.components.GhostCardLabel import GhostCardLabel
 from views.components.CardbackLabel import CardbackLabel
 from utils.ImageHelper import ImageHelper
 from models.AIPlayer import AIPlayer
+from views.AIWorker import AIWorker
 from config.config import Config
 
 class GameView(QFrame):
@@ -36,26 +37,55 @@ class GameView(QFrame):
         self.update_resource_labels()
         self.update_structure_levels()
         self.update_current_turn_marker()
+        self.init_ai_workers()
         self.start_turn()
 
+    def init_ai_workers(self) -> None:
+        # AI turns run on worker threads, the GUI only receives their progress and moves
+        self.ai_progress_label = QLabel(self)
+        self.ai_progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.ai_progress_label.setGeometry(0, 0, self.width(), 20)
+        self.ai_progress_label.setVisible(False)
+
+        self.ai_workers = {}
+        for player in (self.game_instance.player1, self.game_instance.player2):
+            if isinstance(player, AIPlayer):
+                worker = AIWorker(player)
+                worker.move_ready.connect(self.ai_move_ready)
+                worker.progress.connect(self.update_ai_progress)
+                self.ai_workers[player] = worker
+
+    def stop_ai_workers(self) -> None:
+        for player, worker in self.ai_workers.items():
+            worker.stop()
+            player.close()  # Stops pondering as well
+        self.ai_workers = {}
+
     def start_turn(self) -> None:
-        def _handle_ai_turn():
-            current_player = self.game_instance.current_player
-            game_state = self.game_instance.to_state()
-            card, discarded = current_player.take_turn(game_state)
-            card_label = CardLabel(card)
-            if discarded:
-                discard_label = card_label.findChild(CardDiscardLabel)
-                discard_label.setVisible(True)
-
-            self.card_picked_callback(card, card_label, discarded)
-        
         self.ctrl_pressed = False
         self.display_hand()
         QApplication.processEvents()
 
-        if isinstance(self.game_instance.current_player, AIPlayer):
-            QTimer.singleShot(10, lambda: _handle_ai_turn())
+        current_player = self.game_instance.current_player
+        if current_player in self.ai_workers:
+            self.ai_workers[current_player].request_turn(self.game_instance.to_state())
+
+    def ai_move_ready(self, card, discarded) -> None:
+        if self.game_instance.game_status != 0 or not self.ai_workers:
+            return  # The game ended or was left while the AI was thinking
+
+        self.ai_progress_label.setVisible(False)
+        card_label = CardLabel(card)
+        if discarded:
+            discard_label = card_label.findChild(CardDiscardLabel)
+            discard_label.setVisible(True)
+
+        self.card_picked_callback(card, card_label, discarded)
+
+    def update_ai_progress(self, iterations, card, visits) -> None:
+        player_name = self.game_instance.current_player.name
+        self.ai_progress_label.setText(f'{player_name} is thinking: {iterations} iterations, best so far {card.name} ({visits} visits)')
+        self.ai_progress_label.setVisible(True)
 
     def init_last_played_cards_hbox(self) -> None:
         def init_card(sprite_path) -> QLabel: